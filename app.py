@@ -1,12 +1,35 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import subprocess
+from tkinter import ttk, messagebox, filedialog, scrolledtext
+import shlex
 import sys
+import io
+import zipimport
 from PIL import Image, ImageTk
 import webbrowser
 from tkinter.font import Font
 import os
 
+from event_log import leer_eventos, resumir, formatear_resumen
+from job_queue import HERRAMIENTAS, JobQueue
+from output_spool import SALIDA_LINEAS, lanzar
+from profiling import PROFILE, Profiler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ES_ZIPAPP = isinstance(__loader__, zipimport.zipimporter)
+
+
+def leer_recurso(nombre):
+    """Lee un recurso junto a este módulo, ya sea en el repositorio o dentro del zipapp."""
+    return __loader__.get_data(os.path.join(BASE_DIR, nombre))
+
+
+def comando_herramienta(modulo):
+    """Línea de comandos para lanzar una herramienta sin depender del directorio actual."""
+    if ES_ZIPAPP:
+        return [sys.executable, __loader__.archive, modulo]
+    return [sys.executable, os.path.join(BASE_DIR, f"{modulo}.py")]
+
+
 class ModernButton(ttk.Button):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
@@ -32,8 +55,8 @@ class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("RepoSetupToolDesktop 1.0")
-        self.geometry("600x400")
-        self.minsize(800, 500)
+        self.geometry("900x820")
+        self.minsize(800, 700)
         self.configure(bg='#1a1a2e')
         self.style = ttk.Style(self)
         self.style.theme_use('clam')
@@ -42,6 +65,11 @@ class App(tk.Tk):
         self.title_font = Font(family='Roboto', size=24, weight='bold')
         self.button_font = Font(family='Segoe UI', size=12)
         
+        self.jobs = JobQueue()
+        self.console_spool = None
+        self.console_pos = 0
+        self.profile_var = tk.BooleanVar(value=PROFILE)
+        self.profiler = Profiler('app').iniciar() if PROFILE else None
         self.load_resources()
         self.setup_styles()
         self.setup_ui()
@@ -63,12 +91,19 @@ class App(tk.Tk):
                             background='#16213e',
                             foreground='#ffffff',
                             padding=8)
+        self.style.configure('Jobs.Treeview',
+                            background='#16213e',
+                            fieldbackground='#16213e',
+                            foreground='#ffffff',
+                            rowheight=22)
+        self.style.configure('Jobs.TLabelframe', background='#1a1a2e')
+        self.style.configure('Jobs.TLabelframe.Label', background='#1a1a2e', foreground='#8d8d99')
 
     def load_resources(self):
         try:
-            self.logo_image = ImageTk.PhotoImage(Image.open('logo.ico').resize((220, 80)))
-            self.github_icon = ImageTk.PhotoImage(Image.open('hades.jpeg').resize((30, 30)))
-        except FileNotFoundError:
+            self.logo_image = ImageTk.PhotoImage(Image.open(io.BytesIO(leer_recurso('logo.ico'))).resize((220, 80)))
+            self.github_icon = ImageTk.PhotoImage(Image.open(io.BytesIO(leer_recurso('hades.jpeg'))).resize((30, 30)))
+        except OSError:
             messagebox.showwarning("Recursos faltantes", 
                                    "Algunos archivos de imagen no se encontraron. Se usarán placeholders.")
             # Generar placeholders
@@ -116,6 +151,9 @@ class App(tk.Tk):
                      style='Status.TLabel').pack(pady=5)
         
         main_frame.columnconfigure([0,1,2], weight=1)
+
+        self.setup_job_panel()
+        self.setup_console()
         
         # Status Bar
         self.status_bar = ttk.Frame(self, style='TFrame')
@@ -134,13 +172,186 @@ class App(tk.Tk):
         # Setup Menu
         self.setup_menu()
 
+    def setup_job_panel(self):
+        panel = ttk.LabelFrame(self, text="Cola de trabajos", style='Jobs.TLabelframe', padding=10)
+        panel.pack(expand=True, fill='both', padx=40)
+
+        columnas = ('herramienta', 'repo', 'argumentos', 'estado', 'tiempo')
+        self.jobs_tree = ttk.Treeview(panel, columns=columnas, show='headings', height=6, style='Jobs.Treeview')
+        for columna, titulo, ancho in [
+            ('herramienta', "Herramienta", 150), ('repo', "Repositorio", 200), ('argumentos', "Argumentos", 220),
+            ('estado', "Estado", 90), ('tiempo', "Tiempo", 70)
+        ]:
+            self.jobs_tree.heading(columna, text=titulo)
+            self.jobs_tree.column(columna, width=ancho, anchor='w')
+        self.jobs_tree.pack(side='left', expand=True, fill='both')
+        self.jobs_tree.bind('<Double-1>', lambda e: self.show_job_output())
+
+        botones = ttk.Frame(panel, style='TFrame')
+        botones.pack(side='left', fill='y', padx=(10, 0))
+        for texto, comando in [
+            ("Añadir...", self.add_job),
+            ("Iniciar", self.start_queue),
+            ("Pausar", self.pause_queue),
+            ("Cancelar", self.cancel_job),
+            ("Quitar", self.remove_job),
+            ("Ver salida", self.show_job_output),
+        ]:
+            ttk.Button(botones, text=texto, command=comando, style='Menu.TButton').pack(fill='x', pady=2)
+
+    def setup_console(self):
+        panel = ttk.LabelFrame(self, text="Consola", style='Jobs.TLabelframe', padding=10)
+        panel.pack(expand=True, fill='both', padx=40, pady=(10, 0))
+
+        self.console_source = tk.StringVar(value="Sin salida")
+        ttk.Label(panel, textvariable=self.console_source, style='Status.TLabel').pack(anchor='w')
+        self.console = scrolledtext.ScrolledText(panel, height=8, bg='#16213e', fg='#ffffff',
+                                                 insertbackground='#ffffff', font=('Consolas', 9))
+        self.console.pack(expand=True, fill='both')
+
+        self.refresh_jobs()
+
+    def follow_output(self, titulo, spool):
+        """Muestra en la consola la salida de ``spool`` desde el principio de lo que sigue en memoria."""
+        self.console_spool = spool
+        self.console_pos = 0
+        self.console.delete(1.0, tk.END)
+        self.console_source.set(f"{titulo} — salida completa en {spool.ruta}")
+
+    def render_console(self):
+        """Añade las líneas nuevas; la consola conserva como máximo ``SALIDA_LINEAS`` líneas."""
+        if self.console_spool is None:
+            return
+        lineas, omitidas, self.console_pos = self.console_spool.leer_desde(self.console_pos)
+        if not lineas and not omitidas:
+            return
+        al_final = self.console.yview()[1] >= 0.999
+        if omitidas:
+            self.console.insert(tk.END, f"... {omitidas} líneas omitidas (ver {self.console_spool.ruta})\n")
+        self.console.insert(tk.END, ''.join(lineas))
+        sobrantes = int(self.console.index('end-1c').split('.')[0]) - SALIDA_LINEAS
+        if sobrantes > 0:
+            self.console.delete(1.0, f"{sobrantes + 1}.0")
+        if al_final:
+            self.console.see(tk.END)
+
+    def add_job(self):
+        dialogo = tk.Toplevel(self)
+        dialogo.title("Añadir trabajo")
+        dialogo.configure(bg='#1a1a2e')
+        dialogo.transient(self)
+
+        herramienta = tk.StringVar(value=next(iter(HERRAMIENTAS)))
+        repo = tk.StringVar(value=os.getcwd())
+        argumentos = tk.StringVar()
+        ejemplo = tk.StringVar()
+
+        def actualizar_ejemplo(*_):
+            ejemplo.set(f"Ejemplo: {HERRAMIENTAS[herramienta.get()].ejemplo}")
+
+        def elegir_repo():
+            ruta = filedialog.askdirectory(title="Repositorio (con su .env)", initialdir=repo.get())
+            if ruta:
+                repo.set(ruta)
+
+        def aceptar():
+            definicion = HERRAMIENTAS[herramienta.get()]
+            try:
+                extra = shlex.split(argumentos.get())
+            except ValueError as e:
+                messagebox.showerror("Error", f"Argumentos inválidos: {e}", parent=dialogo)
+                return
+            if not os.path.isdir(repo.get()):
+                messagebox.showerror("Error", "El repositorio no existe", parent=dialogo)
+                return
+            argv = comando_herramienta(definicion.modulo) + list(definicion.argumentos) + extra
+            self.jobs.agregar(herramienta.get(), argv, repo.get(), definicion.tipo)
+            self.render_jobs()
+            dialogo.destroy()
+
+        formulario = ttk.Frame(dialogo, style='TFrame', padding=15)
+        formulario.pack(fill='both', expand=True)
+        ttk.Label(formulario, text="Herramienta:", style='Status.TLabel').grid(row=0, column=0, sticky='w', pady=4)
+        selector = ttk.Combobox(formulario, textvariable=herramienta, values=list(HERRAMIENTAS), state='readonly')
+        selector.grid(row=0, column=1, columnspan=2, sticky='ew')
+        selector.bind('<<ComboboxSelected>>', actualizar_ejemplo)
+        ttk.Label(formulario, text="Repositorio:", style='Status.TLabel').grid(row=1, column=0, sticky='w', pady=4)
+        ttk.Entry(formulario, textvariable=repo, width=50).grid(row=1, column=1, sticky='ew')
+        ttk.Button(formulario, text="...", width=3, command=elegir_repo).grid(row=1, column=2, padx=(5, 0))
+        ttk.Label(formulario, text="Argumentos:", style='Status.TLabel').grid(row=2, column=0, sticky='w', pady=4)
+        ttk.Entry(formulario, textvariable=argumentos, width=50).grid(row=2, column=1, columnspan=2, sticky='ew')
+        ttk.Label(formulario, textvariable=ejemplo, style='Status.TLabel').grid(row=3, column=1, columnspan=2, sticky='w')
+        ttk.Button(formulario, text="Añadir", command=aceptar).grid(row=4, column=1, columnspan=2, sticky='e', pady=(10, 0))
+        formulario.columnconfigure(1, weight=1)
+        actualizar_ejemplo()
+
+    def selected_job(self):
+        seleccion = self.jobs_tree.selection()
+        if not seleccion:
+            return None
+        numero = int(seleccion[0])
+        return next((job for job in self.jobs.trabajos if job.numero == numero), None)
+
+    def start_queue(self):
+        self.jobs.iniciar()
+        self.update_status("Cola en marcha")
+        self.render_jobs()
+
+    def pause_queue(self):
+        self.jobs.pausar()
+        self.update_status("Cola en pausa")
+
+    def cancel_job(self):
+        job = self.selected_job()
+        if job:
+            self.jobs.cancelar(job)
+            self.render_jobs()
+
+    def remove_job(self):
+        job = self.selected_job()
+        if job and not self.jobs.quitar(job):
+            messagebox.showwarning("Cola de trabajos", "Cancela el trabajo y espera a que termine antes de quitarlo")
+        self.render_jobs()
+
+    def show_job_output(self):
+        job = self.selected_job()
+        if not job:
+            return
+        if job.spool:
+            self.follow_output(f"Trabajo {job.numero}: {job.herramienta}", job.spool)
+        else:
+            messagebox.showinfo(f"Trabajo {job.numero}: {job.herramienta}",
+                                job.salida or "El trabajo todavía no ha producido salida")
+
+    def render_jobs(self):
+        """Pinta estados y tiempos; los trabajos avanzan en sus hilos y aquí solo se leen."""
+        visibles = set(self.jobs_tree.get_children())
+        actuales = set()
+        for job in list(self.jobs.trabajos):
+            iid = str(job.numero)
+            actuales.add(iid)
+            inicio_args = len(comando_herramienta(HERRAMIENTAS[job.herramienta].modulo))
+            valores = (job.herramienta, job.repo, shlex.join(job.argv[inicio_args:]), job.estado,
+                       f"{job.segundos:.0f}s" if job.inicio else '')
+            if iid in visibles:
+                self.jobs_tree.item(iid, values=valores)
+            else:
+                self.jobs_tree.insert('', 'end', iid=iid, values=valores)
+        for iid in visibles - actuales:
+            self.jobs_tree.delete(iid)
+
+    def refresh_jobs(self):
+        self.render_jobs()
+        self.render_console()
+        self.after(250, self.refresh_jobs)
+
     def setup_menu(self):
         menu_bar = tk.Menu(self)
         
         # Archivo Menu
         file_menu = tk.Menu(menu_bar, tearoff=0, bg='#16213e', fg='white')
         file_menu.add_command(label="Nuevo Proyecto")
-        file_menu.add_command(label="Abrir")
+        file_menu.add_command(label="Abrir Registro...", command=self.open_run_log)
         file_menu.add_separator()
         file_menu.add_command(label="Salir", command=self.on_close)
         
@@ -148,6 +359,8 @@ class App(tk.Tk):
         help_menu = tk.Menu(menu_bar, tearoff=0, bg='#16213e', fg='white')
         help_menu.add_command(label="Documentación", command=self.open_docs)
         help_menu.add_command(label="Actualizaciones")
+        help_menu.add_checkbutton(label="Perfilado (CPU y memoria)", variable=self.profile_var,
+                                  command=self.toggle_profiling)
         help_menu.add_command(label="Acerca de", command=self.show_about)
         
         menu_bar.add_cascade(label="Archivo", menu=file_menu)
@@ -155,28 +368,59 @@ class App(tk.Tk):
         
         self.config(menu=menu_bar)
 
+    def toggle_profiling(self):
+        """Perfila el lanzador y las herramientas que se abran desde ahora, que heredan ``REPOSETUP_PROFILE``."""
+        activo = self.profile_var.get()
+        os.environ['REPOSETUP_PROFILE'] = '1' if activo else '0'
+        if activo and not self.profiler:
+            self.profiler = Profiler('app').iniciar()
+            self.update_status(f"Perfilado activo: {self.profiler.directorio}")
+        elif not activo and self.profiler:
+            self.profiler.detener()
+            messagebox.showinfo("Perfilado", f"Perfil del lanzador guardado en:\n{self.profiler.directorio}")
+            self.profiler = None
+
     def setup_bindings(self):
         self.bind_all("<Control-q>", lambda e: self.on_close())
         self.bind_all("<F1>", lambda e: self.open_docs())
 
     def run_script(self, script_name):
+        """Abre una herramienta sin bloquear el lanzador; su salida se sigue en la consola."""
         try:
-            script_path = os.path.abspath(script_name)  # Get absolute path of the script
-            process = subprocess.Popen([sys.executable, script_path],
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
-            
-            if process.returncode == 0:
-                self.update_status(f"Éxito: {script_name}")
-                messagebox.showinfo("Éxito", f"{script_name} ejecutado correctamente")
-            else:
-                raise subprocess.CalledProcessError(process.returncode, script_name, stderr)
-                
+            modulo = os.path.splitext(script_name)[0]
+            spool = lanzar(comando_herramienta(modulo), f"lanzador-{modulo}")
+            self.follow_output(script_name, spool)
+            self.update_status(f"Ejecutando: {script_name}")
+            self.after(500, self.check_script, spool, script_name)
         except Exception as e:
             messagebox.showerror("Error", f"Error ejecutando {script_name}:\n{str(e)}")
             self.update_status(f"Error: {script_name}")
 
+    def check_script(self, spool, script_name):
+        if spool.proceso.poll() is None or not spool.terminado():
+            self.after(500, self.check_script, spool, script_name)
+            return
+        if spool.proceso.returncode == 0:
+            self.update_status(f"Éxito: {script_name}")
+            messagebox.showinfo("Éxito", f"{script_name} ejecutado correctamente")
+        else:
+            messagebox.showerror("Error", f"Error ejecutando {script_name}:\n{spool.cola(2000)}")
+            self.update_status(f"Error: {script_name}")
+
+    def open_run_log(self):
+        ruta = filedialog.askopenfilename(
+            title="Seleccionar registro de eventos",
+            filetypes=[("Registro de eventos", "*.jsonl *.jsonl.gz"), ("Todos", "*.*")]
+        )
+        if not ruta:
+            return
+        try:
+            resumen = resumir(leer_eventos(ruta))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudo leer el registro:\n{str(e)}")
+            return
+        messagebox.showinfo("Resumen de ejecución", formatear_resumen(resumen))
+
     def update_status(self, message):
         self.status_label.config(text=f"Estado: {message}")
         self.after(3000, lambda: self.status_label.config(text="Estado: Listo"))
@@ -211,6 +455,14 @@ class App(tk.Tk):
         webbrowser.open("https://github.com/Hades0413/RepoSetupToolDesktop0413.git")
 
     def on_close(self):
+        if self.jobs.activos():
+            if not messagebox.askyesno("Salir", "Hay trabajos pendientes o en ejecución. ¿Cancelarlos y salir?"):
+                return
+            self.jobs.pausar()
+            for job in list(self.jobs.trabajos):
+                self.jobs.cancelar(job)
+        if self.profiler:
+            self.profiler.detener()
         self.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+"""Benchmark reproducible de los motores de commits y PRs contra un remoto local.
+
+Cada caso crea un repositorio de trabajo desechable y un repositorio bare local
+que hace de remoto, ejecuta el motor sin interfaz y guarda en un JSON los
+commits/s, los procesos lanzados, el tiempo de push y el tamaño final del remoto.
+
+Uso:
+    python benchmark.py --commits 1000 10000 --prs 10 100
+    python benchmark.py --comparar runs/benchmark-.../resultados.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from create_commits import CommitEngine, GitManager
+from create_pr import PRManager
+from event_log import EventLog, crear_directorio_ejecucion
+
+DEFAULT_COMMITS = [1000, 10000, 100000]
+DEFAULT_PRS = [10, 100, 1000]
+MESES = 10
+AÑO = 2020
+BASE_BRANCH = 'main'
+
+# Sentido de cada métrica al comparar con una ejecución anterior
+MAYOR_ES_MEJOR = ('commits_por_segundo', 'prs_por_segundo')
+MENOR_ES_MEJOR = ('segundos', 'spawns', 'push_segundos', 'repo_bytes')
+
+
+class PRManagerLocal(PRManager):
+    """PRManager que numera los PRs localmente en lugar de llamar a la API de GitHub."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._numeros = itertools.count(1)
+
+    def crear_pr(self, datos_pr):
+        return next(self._numeros)
+
+
+def _git(*args, cwd=None) -> str:
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def _aislar_git():
+    """Evita que la configuración global del usuario (hooks, firmas) afecte las mediciones."""
+    os.environ['GIT_CONFIG_NOSYSTEM'] = '1'
+    os.environ['GIT_CONFIG_GLOBAL'] = os.devnull
+    os.environ['GIT_TERMINAL_PROMPT'] = '0'
+
+
+def preparar_repos(base: str):
+    """Crea un remoto bare y un clon de trabajo con un commit inicial en la rama base."""
+    remoto = os.path.join(base, 'remoto.git')
+    trabajo = os.path.join(base, 'trabajo')
+    _git('init', '-q', '--bare', '-b', BASE_BRANCH, remoto)
+    _git('init', '-q', '-b', BASE_BRANCH, trabajo)
+    _git('config', 'user.name', 'bench', cwd=trabajo)
+    _git('config', 'user.email', 'bench@example.com', cwd=trabajo)
+    _git('remote', 'add', 'origin', remoto, cwd=trabajo)
+    with open(os.path.join(trabajo, 'README.md'), 'w') as f:
+        f.write("benchmark\n")
+    _git('add', 'README.md', cwd=trabajo)
+    _git('commit', '-q', '-m', 'Commit inicial', cwd=trabajo)
+    _git('push', '-q', 'origin', BASE_BRANCH, cwd=trabajo)
+    return trabajo, remoto
+
+
+def tamaño_directorio(ruta: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(raiz, nombre))
+        for raiz, _, archivos in os.walk(ruta)
+        for nombre in archivos
+    )
+
+
+def medir_commits(total: int, base: str, dir_run: str) -> dict:
+    trabajo, remoto = preparar_repos(base)
+    env_vars = {
+        'GITHUB_TOKEN': '',
+        'REPO_OWNER': 'bench',
+        'REPO_NAME': 'bench',
+        'BASE_BRANCH': BASE_BRANCH,
+        'USER_EMAIL': 'bench@example.com',
+        'REPO_URL': remoto
+    }
+    params = {'mes_inicio': 1, 'mes_fin': MESES, 'commits_mes': total // MESES, 'ano': AÑO}
+
+    eventos = EventLog('benchmark', directorio=os.path.join(dir_run, f'commits-{total}'))
+    git = GitManager(env_vars, None, eventos, cwd=trabajo)
+    inicio = time.perf_counter()
+    metricas = CommitEngine(git, eventos).ejecutar(params)
+    segundos = time.perf_counter() - inicio
+    eventos.close()
+
+    return {
+        'commits': metricas['commits'],
+        'segundos': round(segundos, 3),
+        'commits_por_segundo': round(metricas['commits'] / metricas['generacion_segundos'], 2),
+        'spawns': metricas['spawns'],
+        'push_segundos': round(metricas['push_segundos'], 3),
+        'repo_bytes': tamaño_directorio(remoto)
+    }
+
+
+def medir_prs(total: int, base: str, dir_run: str) -> dict:
+    trabajo, remoto = preparar_repos(base)
+    params = {'prs_por_mes': total // MESES, 'año': AÑO, 'mes_inicio': 1, 'mes_fin': MESES}
+
+    eventos = EventLog('benchmark', directorio=os.path.join(dir_run, f'prs-{total}'))
+    prs = PRManagerLocal(lambda texto: None, eventos, cwd=trabajo, base_branch=BASE_BRANCH)
+    inicio = time.perf_counter()
+    metricas = prs.ejecutar(params)
+    segundos = time.perf_counter() - inicio
+    eventos.close()
+
+    return {
+        'prs': metricas['prs'],
+        'segundos': round(segundos, 3),
+        'prs_por_segundo': round(metricas['prs'] / segundos, 2),
+        'spawns': metricas['spawns'],
+        'push_segundos': round(metricas['push_segundos'], 3),
+        'repo_bytes': tamaño_directorio(remoto)
+    }
+
+
+def comparar(actual: dict, anterior: dict, tolerancia: float) -> list:
+    """Devuelve las regresiones de ``actual`` frente a ``anterior`` por encima de la tolerancia."""
+    regresiones = []
+    for caso, metricas in actual['casos'].items():
+        previas = anterior['casos'].get(caso)
+        if not previas:
+            continue
+        for metrica, valor in metricas.items():
+            previo = previas.get(metrica)
+            if not previo or metrica not in MAYOR_ES_MEJOR + MENOR_ES_MEJOR:
+                continue
+            cambio = (valor - previo) / previo
+            if metrica in MAYOR_ES_MEJOR:
+                cambio = -cambio
+            print(f"  {caso:<16} {metrica:<22} {previo:>14} -> {valor:>14} ({cambio:+.1%})")
+            if cambio > tolerancia:
+                regresiones.append((caso, metrica, previo, valor))
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de commits y PRs")
+    parser.add_argument('--commits', type=int, nargs='*', default=DEFAULT_COMMITS,
+                        help=f"Tamaños de los casos de commits (múltiplos de {MESES})")
+    parser.add_argument('--prs', type=int, nargs='*', default=DEFAULT_PRS,
+                        help=f"Tamaños de los casos de PRs (múltiplos de {MESES})")
+    parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto en runs/)")
+    parser.add_argument('--comparar', help="Resultados de una ejecución anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.15,
+                        help="Empeoramiento relativo permitido antes de marcar regresión")
+    parser.add_argument('--conservar', action='store_true', help="No borrar los repositorios temporales")
+    args = parser.parse_args(argv)
+
+    # Cada caso se reparte a partes iguales entre MESES meses; otro tamaño no sería el que se registra
+    invalidos = [total for total in args.commits + args.prs if total <= 0 or total % MESES]
+    if invalidos:
+        parser.error(f"Los tamaños deben ser múltiplos positivos de {MESES}: {', '.join(map(str, invalidos))}")
+
+    _aislar_git()
+    dir_run = crear_directorio_ejecucion('benchmark')
+    salida = args.salida or os.path.join(dir_run, 'resultados.json')
+    resultados = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'git': _git('--version').strip(),
+        'plataforma': platform.platform(),
+        'casos': {}
+    }
+
+    casos = [('commits', total, medir_commits) for total in args.commits]
+    casos += [('prs', total, medir_prs) for total in args.prs]
+    for motor, total, medir in casos:
+        base = tempfile.mkdtemp(prefix=f'reposetup-bench-{motor}-{total}-')
+        print(f"⏱️ {motor} x {total} en {base}", flush=True)
+        try:
+            resultados['casos'][f'{motor}-{total}'] = medir(total, base, dir_run)
+        finally:
+            if not args.conservar:
+                shutil.rmtree(base, ignore_errors=True)
+        print(f"   {json.dumps(resultados['casos'][f'{motor}-{total}'])}", flush=True)
+
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"✅ Resultados: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+        print(f"🔍 Comparando con {args.comparar}")
+        regresiones = comparar(resultados, anterior, args.tolerancia)
+        if regresiones:
+            print(f"❌ {len(regresiones)} regresiones por encima del {args.tolerancia:.0%}")
+            return 1
+        print("✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Empaqueta el lanzador, las herramientas y las imágenes en un único zipapp.
+
+Los módulos se incluyen con su bytecode ya compilado (pyc basados en hash sin
+verificación, que zipimport carga sin leer el fuente) y las imágenes se leen a
+través del loader del paquete. Las dependencias de ``requirements.txt`` se
+siguen instalando en el entorno de Python que ejecuta el zipapp.
+
+Uso:
+    python build_zipapp.py                  # genera dist/reposetup.pyz
+    python build_zipapp.py --medir 10       # además compara el arranque con los archivos sueltos
+    python dist/reposetup.pyz               # abre el lanzador
+    python dist/reposetup.pyz create_pr     # abre directamente una herramienta
+"""
+import argparse
+import glob
+import os
+import py_compile
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipapp
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TARGET = os.path.join(BASE_DIR, 'dist', 'reposetup.pyz')
+EXCLUIR = {'build_zipapp.py'}
+RECURSOS = ('*.ico', '*.png', '*.jpeg', '*.jpg')
+
+MAIN = '''import runpy
+import sys
+
+MODULOS = {modulos!r}
+
+modulo = 'app'
+if len(sys.argv) > 1 and sys.argv[1] in MODULOS:
+    modulo = sys.argv.pop(1)
+runpy.run_module(modulo, run_name='__main__', alter_sys=True)
+'''
+
+# Arranque medido: importar el lanzador y las tres herramientas y leer las imágenes
+MEDICION = '''import sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app, create_commits, create_issues, create_pr
+app.leer_recurso('logo.ico')
+app.leer_recurso('hades.jpeg')
+print(time.perf_counter() - inicio)
+'''
+
+
+def modulos_fuente():
+    return sorted(
+        ruta for ruta in glob.glob(os.path.join(BASE_DIR, '*.py'))
+        if os.path.basename(ruta) not in EXCLUIR
+    )
+
+
+def recursos():
+    return sorted(ruta for patron in RECURSOS for ruta in glob.glob(os.path.join(BASE_DIR, patron)))
+
+
+def preparar(destino: str, compilar: bool = True):
+    """Copia módulos y recursos a ``destino`` y, si se pide, añade su bytecode junto a cada módulo."""
+    modulos = []
+    for ruta in modulos_fuente():
+        nombre = os.path.basename(ruta)
+        shutil.copy2(ruta, os.path.join(destino, nombre))
+        modulos.append(os.path.splitext(nombre)[0])
+        if compilar:
+            py_compile.compile(
+                ruta,
+                cfile=os.path.join(destino, os.path.splitext(nombre)[0] + '.pyc'),
+                dfile=nombre,
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+            )
+    for ruta in recursos():
+        shutil.copy2(ruta, os.path.join(destino, os.path.basename(ruta)))
+    return modulos
+
+
+def construir(target: str = DEFAULT_TARGET) -> str:
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='reposetup-zipapp-') as staging:
+        modulos = preparar(staging)
+        with open(os.path.join(staging, '__main__.py'), 'w', encoding='utf-8') as f:
+            f.write(MAIN.format(modulos=sorted(modulos)))
+        zipapp.create_archive(staging, target, interpreter='/usr/bin/env python3', compressed=True)
+    return target
+
+
+def _medir(ruta: str, repeticiones: int, env=None) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', MEDICION, ruta],
+            check=True, capture_output=True, text=True, env=env
+        ).stdout
+        tiempos.append(float(salida.strip()))
+    return statistics.median(tiempos)
+
+
+def medir_arranque(target: str, repeticiones: int):
+    """Compara la mediana de arranque del zipapp con la de los archivos sueltos."""
+    sin_cache = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    with tempfile.TemporaryDirectory(prefix='reposetup-sueltos-') as sueltos:
+        preparar(sueltos, compilar=False)
+        casos = [
+            ('archivos sueltos (sin __pycache__)', _medir(sueltos, repeticiones, sin_cache)),
+            ('archivos sueltos (con __pycache__)', _medir(sueltos, repeticiones)),
+            ('zipapp con bytecode', _medir(target, repeticiones)),
+        ]
+    for nombre, segundos in casos:
+        print(f"  {nombre:<36} {segundos * 1000:8.1f} ms")
+    return casos
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Genera el zipapp de RepoSetupToolDesktop")
+    parser.add_argument('--salida', default=DEFAULT_TARGET, help="Ruta del .pyz a generar")
+    parser.add_argument('--medir', type=int, metavar='N', default=0,
+                        help="Mide el arranque N veces frente a los archivos sueltos")
+    args = parser.parse_args(argv)
+
+    target = construir(args.salida)
+    print(f"✅ Zipapp generado: {target} ({os.path.getsize(target) / 1024:.0f} KB)")
+    if args.medir:
+        print(f"⏱️ Mediana de arranque en {args.medir} ejecuciones:")
+        medir_arranque(target, args.medir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Limpieza de los issues y ramas de PR que dejan las ejecuciones de prueba.
+
+Los issues generados se buscan por título (por defecto el formato
+``Issue N - AAAA-MM-DD`` de ``create_issues.py`` y ``scheduler.py``) y se
+cierran con un número acotado de solicitudes en vuelo. Las ramas ``pr/*``
+huérfanas se eliminan en local con una sola transacción de ``update-ref`` y en
+el remoto con un único push de borrado tras listarlas con ``ls-remote``.
+
+Uso:
+    python cleanup.py                       # issues y ramas
+    python cleanup.py --solo-issues --patron "^Issue \\d+"
+    python cleanup.py --solo-ramas --simular
+"""
+import argparse
+import os
+import re
+import sys
+from typing import Callable, Dict, Iterator, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from event_log import EventLog
+from git_executor import GitError, GitExecutor, repo_url_de
+from github_api import GITHUB_API_URL, GitHubAPI, en_ventana
+from profiling import perfilar
+
+# Títulos de los issues de create_issues.py (plantilla) y scheduler.py
+PATRON_ISSUES = r'^Issue \d+ - \d{4}-\d{2}-\d{2}$'
+PREFIJO_RAMAS = 'pr/'
+
+# Número máximo de solicitudes de cierre en vuelo
+CLEANUP_WINDOW = int(os.getenv('CLEANUP_WINDOW', '8'))
+
+
+class Limpieza:
+    def __init__(self, env_vars: Dict[str, str], output_insert: Callable[[str], None],
+                 eventos: Optional[EventLog] = None, cwd: Optional[str] = None):
+        self.env_vars = env_vars
+        self.output_insert = output_insert
+        self.eventos = eventos
+        self.cwd = cwd
+        # Sin consola: los cierres se envían desde los hilos del pool
+        self.api = GitHubAPI(env_vars['GITHUB_TOKEN'], eventos)
+        self.issues_url = f"{GITHUB_API_URL}/repos/{env_vars['REPO_OWNER']}/{env_vars['REPO_NAME']}/issues"
+
+    def _emit(self, evento: str, **campos):
+        if self.eventos:
+            self.eventos.emit(evento, **campos)
+
+    def buscar_issues(self, patron: str) -> Iterator[dict]:
+        """Issues abiertos cuyo título cumple ``patron``, recorriendo todas las páginas."""
+        regex = re.compile(patron)
+        for issue in self.api.paginas(self.issues_url, {'state': 'open', 'per_page': 100}):
+            # La API de issues también devuelve los PRs
+            if 'pull_request' not in issue and regex.search(issue['title']):
+                yield issue
+
+    def cerrar_issue(self, numero: int) -> requests.Response:
+        return self.api.solicitud('PATCH', f"{self.issues_url}/{numero}",
+                                  json={'state': 'closed', 'state_reason': 'not_planned'})
+
+    def cerrar_issues(self, patron: str = PATRON_ISSUES, simular: bool = False,
+                      ventana: int = CLEANUP_WINDOW) -> Dict[str, int]:
+        """Cierra los issues generados con como máximo ``ventana`` solicitudes en vuelo.
+
+        Los candidatos se listan antes de cerrar ninguno: cerrar mientras se
+        pagina desplaza los resultados y se saltarían issues.
+        """
+        contadores = {'cerrados': 0, 'fallidos': 0}
+        issues = list(self.buscar_issues(patron))
+        self.output_insert(f"🔍 {len(issues)} issues abiertos coinciden con {patron}\n")
+        if simular:
+            for issue in issues:
+                self.output_insert(f"   #{issue['number']} {issue['title']}\n")
+            return contadores
+
+        def completar(futuro, issue):
+            try:
+                response = futuro.result()
+            except requests.exceptions.RequestException as e:
+                error = f"Error de conexión: {e}"
+            else:
+                error = None if response.ok else f"Error {response.status_code}: {response.text[:200]}"
+            if error:
+                contadores['fallidos'] += 1
+                self._emit('error', numero=issue['number'], error=error)
+                self.output_insert(f"❌ #{issue['number']}: {error}\n")
+            else:
+                contadores['cerrados'] += 1
+                self._emit('issue', numero=issue['number'], estado='cerrado')
+                self.output_insert(f"✅ #{issue['number']} cerrado: {issue['title']}\n")
+
+        en_ventana(lambda issue: self.cerrar_issue(issue['number']), issues, ventana, completar)
+        return contadores
+
+    def limpiar_ramas(self, simular: bool = False) -> Dict[str, int]:
+        """Elimina las ramas ``pr/*`` locales (y su seguimiento remoto) y las del remoto."""
+        contadores = {'locales': 0, 'remotas': 0}
+        with GitExecutor(self.cwd, {'GITHUB_TOKEN': self.env_vars['GITHUB_TOKEN']},
+                         self.eventos, self.env_vars['GITHUB_TOKEN']) as git:
+            actual = git.run('symbolic-ref', '-q', 'HEAD', check=False).stdout.strip()
+            locales = [
+                ref for ref in git.run(
+                    'for-each-ref', '--format=%(refname)',
+                    f'refs/heads/{PREFIJO_RAMAS}', f'refs/remotes/*/{PREFIJO_RAMAS}*'
+                ).stdout.split()
+                if ref != actual
+            ]
+            if actual.startswith(f'refs/heads/{PREFIJO_RAMAS}'):
+                self.output_insert(f"⚠️ {actual} está activa y no se elimina\n")
+
+            salida = git.run('ls-remote', '--heads', repo_url_de(self.env_vars),
+                             f'refs/heads/{PREFIJO_RAMAS}*').stdout
+            remotas = [linea.split('\t')[1] for linea in salida.splitlines() if '\t' in linea]
+            self.output_insert(f"🔍 {len(locales)} ramas locales y {len(remotas)} remotas con prefijo {PREFIJO_RAMAS}\n")
+
+            for ref in locales + [f"(remoto) {ref}" for ref in remotas]:
+                self.output_insert(f"   {ref}\n")
+            if simular:
+                return contadores
+
+            if locales:
+                git.actualizar_refs([(ref, None, None) for ref in locales])
+                contadores['locales'] = len(locales)
+                self.output_insert(f"✅ {len(locales)} ramas locales eliminadas\n")
+            for lote, error in git.push(repo_url_de(self.env_vars), [f':{ref}' for ref in remotas], check=False):
+                if error:
+                    self._emit('error', error=error.stderr)
+                    self.output_insert(f"❌ Error eliminando ramas remotas: {error.stderr}\n")
+                else:
+                    contadores['remotas'] += len(lote)
+                    self.output_insert(f"✅ {len(lote)} ramas remotas eliminadas\n")
+        self._emit('limpieza', **contadores)
+        return contadores
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cierra issues generados y elimina ramas pr/* huérfanas")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument('--solo-issues', action='store_true')
+    grupo.add_argument('--solo-ramas', action='store_true')
+    parser.add_argument('--patron', default=PATRON_ISSUES, help="Expresión regular de los títulos a cerrar")
+    parser.add_argument('--ventana', type=int, default=CLEANUP_WINDOW, help="Solicitudes de cierre en vuelo")
+    parser.add_argument('--simular', action='store_true', help="Solo lista lo que se eliminaría")
+    args = parser.parse_args(argv)
+
+    load_dotenv('.env')
+    env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')}
+    if None in env_vars.values():
+        print("❌ Faltan variables en el archivo .env")
+        return 1
+    env_vars['REPO_URL'] = os.getenv('REPO_URL')
+
+    eventos = EventLog('limpieza')
+    eventos.emit('inicio', patron=args.patron, simular=args.simular)
+    limpieza = Limpieza(env_vars, lambda texto: print(texto, end='', flush=True), eventos)
+    resultado = {}
+    try:
+        if not args.solo_ramas:
+            resultado.update(limpieza.cerrar_issues(args.patron, args.simular, args.ventana))
+        if not args.solo_issues:
+            resultado.update(limpieza.limpiar_ramas(args.simular))
+    except (requests.exceptions.RequestException, GitError) as e:
+        eventos.emit('error', error=str(e))
+        print(f"❌ {e}")
+        return 1
+    finally:
+        eventos.emit('fin', **resultado)
+        eventos.close()
+    print(f"⚙️ Registro de eventos: {eventos.ruta}")
+    return 0
+
+
+if __name__ == "__main__":
+    with perfilar('cleanup'):
+        sys.exit(main())
@@ -1,11 +1,18 @@
+import argparse
 import requests
+import csv
 import json
 import os
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from dotenv import load_dotenv
 from datetime import datetime
 
+from event_log import EventLog, reproducir
+from github_api import GITHUB_API_URL, GitHubAPI, en_ventana
+from profiling import perfilar
+
 # Configuración visual
 LINEA = "═" * 60
 EMOJI = {
@@ -18,7 +25,243 @@ EMOJI = {
     "link": "🔗"
 }
 
-GITHUB_API_URL = 'https://api.github.com'
+# Importación masiva: número máximo de solicitudes de creación en vuelo
+IMPORT_WINDOW = int(os.getenv('IMPORT_WINDOW', '8'))
+MAX_TITLE_LENGTH = 256
+
+
+def _decodificar(f, errores):
+    """Genera (línea, texto) decodificando cada línea por separado.
+
+    Las líneas que no son UTF-8 (p. ej. un CSV exportado en cp1252) se anotan en
+    ``errores`` con su texto original escapado y se sustituyen por una línea vacía,
+    que ambos formatos saltan sin descuadrar la numeración.
+    """
+    for num, crudo in enumerate(f, 1):
+        try:
+            # utf-8-sig quita el BOM que añade Excel al guardar como "CSV UTF-8"
+            yield num, crudo.decode('utf-8-sig' if num == 1 else 'utf-8')
+        except UnicodeDecodeError as e:
+            errores.append((num, crudo.decode('utf-8', errors='backslashreplace'),
+                            f"La línea no está en UTF-8: {e.reason}"))
+            yield num, ''
+
+
+def leer_registros(ruta):
+    """Genera (línea, registro, error) leyendo un CSV o JSONL registro a registro.
+
+    Si una línea no se puede leer, ``registro`` es el texto original de la línea.
+    """
+    errores = []
+    with open(ruta, 'rb') as f:
+        lineas = _decodificar(f, errores)
+        if ruta.lower().endswith(('.jsonl', '.ndjson')):
+            for num, linea in lineas:
+                yield from errores
+                errores.clear()
+                if not linea.strip():
+                    continue
+                try:
+                    yield num, json.loads(linea), None
+                except json.JSONDecodeError as e:
+                    yield num, linea, f"JSON inválido: {e.msg}"
+        else:
+            reader = csv.DictReader(texto for _, texto in lineas)
+            for registro in reader:
+                yield from errores
+                errores.clear()
+                yield reader.line_num, registro, None
+        yield from errores
+
+
+def _lista(valor):
+    if valor is None or valor == '':
+        return []
+    if isinstance(valor, str):
+        return [v.strip() for v in valor.split(',') if v.strip()]
+    if isinstance(valor, list) and all(isinstance(v, str) for v in valor):
+        return valor
+    raise ValueError("debe ser una lista de textos")
+
+
+def validar_registro(registro):
+    """Devuelve (datos_api, None) si el registro es válido o (None, error)."""
+    if not isinstance(registro, dict):
+        return None, "El registro debe ser un objeto"
+
+    title = registro.get('title') or ''
+    if not isinstance(title, str):
+        return None, "'title' debe ser un texto"
+    title = title.strip()
+    if not title:
+        return None, "Falta el título"
+    if len(title) > MAX_TITLE_LENGTH:
+        return None, f"El título supera {MAX_TITLE_LENGTH} caracteres"
+
+    body = registro.get('body') or ''
+    if not isinstance(body, str):
+        return None, "'body' debe ser un texto"
+
+    datos = {'title': title, 'body': body}
+    for campo in ('labels', 'assignees'):
+        try:
+            valores = _lista(registro.get(campo))
+        except ValueError as e:
+            return None, f"'{campo}' {e}"
+        if valores:
+            datos[campo] = valores
+
+    milestone = registro.get('milestone')
+    if milestone not in (None, ''):
+        # bool es subclase de int: True no debe convertirse en el milestone 1
+        if isinstance(milestone, bool) or not isinstance(milestone, (int, str)):
+            return None, "'milestone' debe ser el número del milestone"
+        try:
+            datos['milestone'] = int(milestone)
+        except ValueError:
+            return None, "'milestone' debe ser el número del milestone"
+
+    return datos, None
+
+
+def enviar_issue(api, url, datos):
+    """POST de un issue con reintentos; se ejecuta en los hilos del pool de importación."""
+    start_time = datetime.now()
+    response = api.crear_issue(url, datos)
+    elapsed = (datetime.now() - start_time).total_seconds()
+    return response, elapsed
+
+
+def cuerpo_plantilla(i):
+    return f"""## Descripción del issue {i}
+
+Este es un issue generado automáticamente el {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+**Detalles:**
+- Prioridad: Alta
+- Tipo: Mejora
+- Asignado: Equipo de desarrollo"""
+
+
+class IssueManager:
+    """Crea issues por la API de GitHub; no depende de la interfaz."""
+
+    def __init__(self, env_vars, output_insert, eventos=None):
+        self.output_insert = output_insert
+        self.eventos = eventos
+        self.url = f"{GITHUB_API_URL}/repos/{env_vars['REPO_OWNER']}/{env_vars['REPO_NAME']}/issues"
+        # Sin consola: la importación llama a la API desde los hilos del pool
+        self.api = GitHubAPI(env_vars['GITHUB_TOKEN'], eventos)
+
+    def _emit(self, evento, **campos):
+        if self.eventos:
+            self.eventos.emit(evento, **campos)
+
+    def crear_issue(self, title, body, issue_num, total):
+        try:
+            data = {
+                'title': title,
+                'body': body
+            }
+
+            progress = f"[{issue_num}/{total}]"
+            self.output_insert(f"{EMOJI['progress']} {progress} Creando issue: {title[:30]}...\n")
+
+            response, elapsed = enviar_issue(self.api, self.url, data)
+
+            if response.ok:
+                issue = response.json()
+                self._emit('issue', numero=issue['number'], url=issue['html_url'])
+                self.output_insert(f"{EMOJI['success']} {progress} Issue creado en {elapsed:.2f}s\n")
+                self.output_insert(f"{EMOJI['link']} URL: {issue['html_url']}\n")
+                return True
+            else:
+                self.output_insert(f"{EMOJI['error']} {progress} Error {response.status_code}\n")
+                self.output_insert(f"Respuesta: {response.text[:200]}...\n")
+                return False
+
+        except Exception as e:
+            self._emit('error', error=str(e))
+            self.output_insert(f"{EMOJI['error']} Error crítico: {str(e)}\n")
+            return False
+
+    def crear_plantilla(self, total):
+        """Crea ``total`` issues con la plantilla y devuelve los contadores ok/error."""
+        contadores = {'ok': 0, 'error': 0}
+        for i in range(1, total + 1):
+            title = f'Issue {i} - {datetime.now().strftime("%Y-%m-%d")}'
+            if self.crear_issue(title, cuerpo_plantilla(i), i, total):
+                contadores['ok'] += 1
+            else:
+                contadores['error'] += 1
+        return contadores
+
+    def importar(self, ruta):
+        """Importa issues desde CSV/JSONL con una ventana acotada de solicitudes en vuelo.
+
+        El archivo se lee registro a registro y cada resultado se escribe en
+        ``<archivo>.resultado.jsonl`` en cuanto termina. Los registros fallidos se
+        copian tal cual a ``<archivo>.fallidos.jsonl`` para poder reimportarlos.
+        Devuelve los contadores y las rutas de ambos archivos.
+        """
+        base = os.path.splitext(ruta)[0]
+        ruta_resultado = base + '.resultado.jsonl'
+        ruta_fallidos = base + '.fallidos.jsonl'
+        url = self.url
+        contadores = {'ok': 0, 'error': 0}
+
+        self.output_insert(f"\n{EMOJI['issue']} IMPORTANDO ISSUES DESDE {os.path.basename(ruta)}\n")
+        self.output_insert(f"{EMOJI['config']} Solicitudes simultáneas: {IMPORT_WINDOW}\n")
+
+        with open(ruta_resultado, 'w', encoding='utf-8') as resultado, \
+                open(ruta_fallidos, 'w', encoding='utf-8') as fallidos:
+
+            def registrar(num, registro, error=None, issue=None, elapsed=None, crudo=None):
+                linea = {'linea': num, 'estado': 'error' if error else 'ok'}
+                if error:
+                    linea['error'] = error
+                    self._emit('error', linea=num, error=error)
+                    self.output_insert(f"{EMOJI['error']} Línea {num}: {error}\n")
+                    if crudo is not None:
+                        # Línea ilegible: se copia tal cual para corregirla y reimportarla
+                        fallidos.write(crudo if crudo.endswith('\n') else crudo + '\n')
+                    elif registro is not None:
+                        fallidos.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                else:
+                    linea.update(numero=issue['number'], url=issue['html_url'], segundos=round(elapsed, 3))
+                    self._emit('issue', linea=num, numero=issue['number'], url=issue['html_url'])
+                    self.output_insert(f"{EMOJI['success']} Línea {num}: #{issue['number']} creado en {elapsed:.2f}s\n")
+                resultado.write(json.dumps(linea, ensure_ascii=False) + '\n')
+                contadores[linea['estado']] += 1
+
+            def validos():
+                for num, registro, error in leer_registros(ruta):
+                    if error:
+                        registrar(num, None, error=error, crudo=registro)
+                        continue
+                    datos, error = validar_registro(registro)
+                    if error:
+                        registrar(num, registro, error=error)
+                        continue
+                    yield num, registro, datos
+
+            def completar(futuro, elemento):
+                num, registro, _ = elemento
+                try:
+                    response, elapsed = futuro.result()
+                except requests.exceptions.RequestException as e:
+                    registrar(num, registro, error=f"Error de conexión: {e}")
+                    return
+                if response.ok:
+                    registrar(num, registro, issue=response.json(), elapsed=elapsed)
+                else:
+                    registrar(num, registro, error=f"Error {response.status_code}: {response.text[:200]}")
+
+            # Aunque la lectura falle, los issues ya enviados quedan en el archivo de resultados
+            en_ventana(lambda elemento: enviar_issue(self.api, url, elemento[2]), validos(), IMPORT_WINDOW, completar)
+
+        return contadores, ruta_resultado, ruta_fallidos
+
 
 class GitHubIssueCreatorApp(tk.Tk):
     def __init__(self):
@@ -86,12 +329,15 @@ class GitHubIssueCreatorApp(tk.Tk):
         exec_frame = ttk.Frame(main_frame)
         exec_frame.pack(fill=tk.X, pady=10)
         ttk.Button(exec_frame, text="Crear Issues", command=self._execute).pack(side=tk.LEFT, padx=5)
+        ttk.Button(exec_frame, text="Importar desde Archivo", command=self._import_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(exec_frame, text="Cerrar Generados", command=self._cerrar_generados).pack(side=tk.LEFT, padx=5)
 
         # Botones para limpiar la consola y los campos
         control_frame = ttk.Frame(main_frame)
         control_frame.pack(fill=tk.X, pady=5)
         ttk.Button(control_frame, text="Limpiar Consola", command=self.clear_console).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Limpiar Campos", command=self.clear_fields).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Reproducir Registro", command=self._replay_log).pack(side=tk.LEFT, padx=5)
 
         self.output = scrolledtext.ScrolledText(
             main_frame,
@@ -113,7 +359,7 @@ class GitHubIssueCreatorApp(tk.Tk):
 
     def _load_env_if_exists(self):
         if os.path.exists('.env'):
-            load_dotenv()
+            load_dotenv('.env')
             for key in self.entries:
                 if key in os.environ:
                     self.entries[key].insert(0, os.getenv(key))
@@ -134,38 +380,74 @@ class GitHubIssueCreatorApp(tk.Tk):
             messagebox.showerror("Error", "El valor de Total de Issues debe ser un número entero válido")
             return None
 
-    def _create_issue(self, title, body, issue_num, total):
+    def _import_file(self):
+        ruta = filedialog.askopenfilename(
+            title="Seleccionar archivo de issues",
+            filetypes=[("CSV o JSONL", "*.csv *.jsonl *.ndjson"), ("Todos", "*.*")]
+        )
+        if ruta:
+            self._importar_issues(ruta)
+
+    def _importar_issues(self, ruta):
+        self.output.delete(1.0, tk.END)
+        if not all(self.entries[key].get() for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')):
+            messagebox.showerror("Error", "Completa el token, el dueño y el nombre del repositorio")
+            return
+
+        env_vars = {key: self.entries[key].get() for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')}
+        self._eventos = EventLog('issues')
+        self._eventos.emit('inicio', modo='importacion', archivo=ruta, ventana=IMPORT_WINDOW)
+        issues = IssueManager(env_vars, self.output_insert, self._eventos)
+        contadores = {}
         try:
-            url = f"{GITHUB_API_URL}/repos/{self.entries['REPO_OWNER'].get()}/{self.entries['REPO_NAME'].get()}/issues"
-            headers = {
-                'Authorization': f'token {self.entries["GITHUB_TOKEN"].get()}',
-                'Accept': 'application/vnd.github.v3+json'
-            }
-            data = {
-                'title': title,
-                'body': body
-            }
+            contadores, ruta_resultado, ruta_fallidos = issues.importar(ruta)
+        except Exception as e:
+            self._eventos.emit('error', error=str(e))
+            self.output_insert(f"{EMOJI['error']} Importación interrumpida: {e}\n")
+        finally:
+            self._eventos.emit('fin', issues=contadores.get('ok'), fallidos=contadores.get('error'))
+            self._eventos.close()
+        if not contadores:
+            self.output_insert(f"{EMOJI['config']} Registro de eventos: {self._eventos.ruta}\n")
+            return
 
-            progress = f"[{issue_num}/{total}]"
-            self.output_insert(f"{EMOJI['progress']} {progress} Creando issue: {title[:30]}...\n")
+        self.output_insert(f"\n{EMOJI['success']} Issues importados: {contadores['ok']}\n")
+        self.output_insert(f"{EMOJI['error']} Registros fallidos: {contadores['error']}\n")
+        self.output_insert(f"{EMOJI['link']} Resultados: {ruta_resultado}\n")
+        if contadores['error']:
+            self.output_insert(f"{EMOJI['warning']} Reimporta los fallidos desde: {ruta_fallidos}\n")
+        self.output_insert(f"{EMOJI['config']} Registro de eventos: {self._eventos.ruta}\n")
+        verificar(self._eventos.ruta, env_vars, self.output_insert)
+        self.output_insert(f"{EMOJI['success']} PROCESO COMPLETADO\n")
 
-            start_time = datetime.now()
-            response = requests.post(url, headers=headers, json=data)
-            elapsed = (datetime.now() - start_time).total_seconds()
+    def _cerrar_generados(self):
+        """Cierra los issues abiertos con el título de los issues generados."""
+        # cleanup importa este módulo, así que se importa al usarlo
+        from cleanup import PATRON_ISSUES, Limpieza
 
-            if response.status_code == 201:
-                issue = response.json()
-                self.output_insert(f"{EMOJI['success']} {progress} Issue creado en {elapsed:.2f}s\n")
-                self.output_insert(f"{EMOJI['link']} URL: {issue['html_url']}")
-                return True
-            else:
-                self.output_insert(f"{EMOJI['error']} {progress} Error {response.status_code}\n")
-                self.output_insert(f"Respuesta: {response.text[:200]}...\n")
-                return False
+        if not all(self.entries[key].get() for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')):
+            messagebox.showerror("Error", "Completa el token, el dueño y el nombre del repositorio")
+            return
+        if not messagebox.askyesno("Cerrar Generados", f"¿Cerrar todos los issues abiertos que coincidan con {PATRON_ISSUES}?"):
+            return
 
-        except Exception as e:
-            self.output_insert(f"{EMOJI['error']} Error crítico: {str(e)}")
-            return False
+        self.output.delete(1.0, tk.END)
+        env_vars = {key: self.entries[key].get() for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')}
+        self._eventos = EventLog('limpieza')
+        self._eventos.emit('inicio', patron=PATRON_ISSUES)
+        resultado = {}
+        try:
+            resultado = Limpieza(env_vars, self.output_insert, self._eventos).cerrar_issues()
+        except requests.exceptions.RequestException as e:
+            self._eventos.emit('error', error=str(e))
+            self.output_insert(f"{EMOJI['error']} Error consultando los issues: {e}\n")
+        finally:
+            self._eventos.emit('fin', **resultado)
+            self._eventos.close()
+        if resultado:
+            self.output_insert(f"\n{EMOJI['success']} Issues cerrados: {resultado['cerrados']}\n")
+            self.output_insert(f"{EMOJI['error']} Fallidos: {resultado['fallidos']}\n")
+        self.output_insert(f"{EMOJI['config']} Registro de eventos: {self._eventos.ruta}\n")
 
     def output_insert(self, text: str):
         self.output.insert(tk.END, text)
@@ -176,6 +458,15 @@ class GitHubIssueCreatorApp(tk.Tk):
         """Limpiar la consola de salida."""
         self.output.delete(1.0, tk.END)
 
+    def _replay_log(self):
+        ruta = filedialog.askopenfilename(
+            title="Seleccionar registro de eventos",
+            filetypes=[("Registro de eventos", "*.jsonl *.jsonl.gz"), ("Todos", "*.*")]
+        )
+        if ruta:
+            self.clear_console()
+            reproducir(ruta, self.output_insert)
+
     def clear_fields(self):
         """Limpiar los campos de entrada."""
         for key, entry in self.entries.items():
@@ -188,7 +479,7 @@ class GitHubIssueCreatorApp(tk.Tk):
         if not params:
             return
 
-        load_dotenv()
+        load_dotenv('.env')
         github_token = os.getenv('GITHUB_TOKEN')
         repo_owner = os.getenv('REPO_OWNER')
         repo_name = os.getenv('REPO_NAME')
@@ -197,27 +488,17 @@ class GitHubIssueCreatorApp(tk.Tk):
             messagebox.showerror("Error", "Faltan variables en el archivo .env")
             return
 
+        env_vars = {key: self.entries[key].get() for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')}
         total_issues = params['total_issues']
-        success_count = 0
-        failed_count = 0
-
+        self._eventos = EventLog('issues')
+        self._eventos.emit('inicio', modo='plantilla', total=total_issues)
         self.output_insert(f"\n{EMOJI['success']} INICIANDO CREACIÓN DE {total_issues} ISSUES\n")
 
-        for i in range(1, total_issues + 1):
-            title = f'Issue {i} - {datetime.now().strftime("%Y-%m-%d")}'
-            body = f"""## Descripción del issue {i}
+        contadores = IssueManager(env_vars, self.output_insert, self._eventos).crear_plantilla(total_issues)
+        success_count, failed_count = contadores['ok'], contadores['error']
 
-Este es un issue generado automáticamente el {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
-**Detalles:**
-- Prioridad: Alta
-- Tipo: Mejora
-- Asignado: Equipo de desarrollo"""
-
-            if self._create_issue(title, body, i, total_issues):
-                success_count += 1
-            else:
-                failed_count += 1
+        self._eventos.emit('fin', issues=success_count, fallidos=failed_count)
+        self._eventos.close()
 
         self.output_insert(f"\n{EMOJI['success']} Issues exitosos: {success_count}\n")
         self.output_insert(f"{EMOJI['error']} Issues fallidos: {failed_count}\n")
@@ -228,8 +509,60 @@ Este es un issue generado automáticamente el {datetime.now().strftime("%Y-%m-%d
         else:
             self.output_insert(f"\n{EMOJI['warning']} ALGUNOS ISSUES TUVIERON PROBLEMAS\n")
 
+        self.output_insert(f"{EMOJI['config']} Registro de eventos: {self._eventos.ruta}\n")
+        verificar(self._eventos.ruta, env_vars, self.output_insert)
         self.output_insert(f"{EMOJI['success']} PROCESO COMPLETADO\n")
 
+
+def verificar(ruta, env_vars, output_insert):
+    """Verificación posterior de la ejecución; verify importa este módulo, así que se importa al usarla."""
+    from verify import verificar_ejecucion
+    return verificar_ejecucion(ruta, env_vars, output_insert)
+
+
+def main(argv=None):
+    """Modo sin interfaz, usado por la cola de trabajos del lanzador."""
+    parser = argparse.ArgumentParser(description="Crea issues en GitHub sin interfaz")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument('--total', type=int, help="Issues a crear con la plantilla")
+    grupo.add_argument('--importar', metavar='ARCHIVO', help="CSV o JSONL con los issues a crear")
+    args = parser.parse_args(argv)
+
+    load_dotenv('.env')
+    env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')}
+    if None in env_vars.values():
+        print(f"{EMOJI['error']} Faltan variables en el archivo .env")
+        return 1
+
+    eventos = EventLog('issues')
+    issues = IssueManager(env_vars, lambda texto: print(texto, end='', flush=True), eventos)
+    contadores = {}
+    try:
+        if args.importar:
+            eventos.emit('inicio', modo='importacion', archivo=args.importar, ventana=IMPORT_WINDOW)
+            contadores, _, ruta_fallidos = issues.importar(args.importar)
+        else:
+            eventos.emit('inicio', modo='plantilla', total=args.total)
+            contadores = issues.crear_plantilla(args.total)
+    except Exception as e:
+        eventos.emit('error', error=str(e))
+        print(f"{EMOJI['error']} Importación interrumpida: {e}")
+        return 1
+    finally:
+        eventos.emit('fin', issues=contadores.get('ok'), fallidos=contadores.get('error'))
+        eventos.close()
+
+    print(f"{EMOJI['success']} Issues creados: {contadores['ok']}, fallidos: {contadores['error']}")
+    if args.importar and contadores['error']:
+        print(f"{EMOJI['warning']} Reimporta los fallidos desde: {ruta_fallidos}")
+    print(f"{EMOJI['config']} Registro de eventos: {eventos.ruta}")
+    coincide = verificar(eventos.ruta, env_vars, lambda texto: print(texto, end=''))
+    return 1 if contadores['error'] or not coincide else 0
+
+
 if __name__ == "__main__":
-    app = GitHubIssueCreatorApp()
-    app.mainloop()
+    with perfilar('create_issues'):
+        if len(sys.argv) > 1:
+            sys.exit(main())
+        app = GitHubIssueCreatorApp()
+        app.mainloop()
@@ -1,14 +1,193 @@
+import argparse
 import os
 import random
-import subprocess
+import sys
+import time
 import requests
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 
+from cleanup import Limpieza
+from event_log import EventLog, reproducir
+from git_bundle import exportar as exportar_bundle
+from git_executor import GitError, GitExecutor
+from github_api import GITHUB_API_URL, GitHubAPI
+from profiling import perfilar
+from verify import verificar_ejecucion
+
 # Cargar variables de entorno si existen
-load_dotenv()
+load_dotenv('.env')
+
+class PRManager:
+    """Crea y mergea PRs con fechas históricas; no depende de la interfaz."""
+
+    def __init__(self, output_insert, eventos: Optional[EventLog] = None, cwd: Optional[str] = None,
+                 base_branch: Optional[str] = None, remote: str = 'origin', api: Optional[GitHubAPI] = None):
+        self.output_insert = output_insert
+        self.eventos = eventos
+        self.cwd = cwd
+        self.git = GitExecutor(cwd, eventos=eventos, token=os.getenv('GITHUB_TOKEN'))
+        self.base_branch = base_branch or os.getenv('BASE_BRANCH') or 'main'
+        self.remote = remote
+        self.api = api or GitHubAPI(os.getenv('GITHUB_TOKEN'), eventos, output_insert)
+        self.prs_creados = 0
+        self.push_segundos = 0.0
+        self.bundle = None
+
+    def _emit(self, evento, **campos):
+        if self.eventos:
+            self.eventos.emit(evento, **campos)
+
+    def ejecutar(self, params):
+        """Procesa todos los meses del rango y devuelve métricas de la ejecución.
+
+        Con ``params['bundle']`` se trabaja sin conexión: las ramas se mergean
+        localmente sin crear PRs en GitHub y el resultado se exporta como bundle.
+        """
+        inicio = time.perf_counter()
+        self.bundle = params.get('bundle')
+        base_bundle = self.git.resolver(f'refs/heads/{self.base_branch}') if self.bundle else None
+        try:
+            for mes in range(params['mes_inicio'], params['mes_fin'] + 1):
+                self.output_insert(f"\n📅 Procesando {mes:02d}/{params['año']}\n")
+                for pr_num in range(1, params['prs_por_mes'] + 1):
+                    self.output_insert(f"🔄 Procesando PR {pr_num}/{params['prs_por_mes']}\n")
+                    self.crear_y_mergear_pr(mes, params['año'], pr_num)
+            if self.bundle:
+                sha = exportar_bundle(self.git, self.bundle, self.base_branch, base_bundle)
+                self._emit('bundle', ruta=os.path.abspath(self.bundle), rama=self.base_branch,
+                           sha=sha, base=base_bundle)
+                self.output_insert(f"📦 Bundle generado: {self.bundle} ({self.base_branch} en {sha[:10]})\n")
+        finally:
+            self.git.close()
+        return {
+            'prs': self.prs_creados,
+            'segundos': time.perf_counter() - inicio,
+            'push_segundos': self.push_segundos,
+            'spawns': self.git.spawns
+        }
+
+    def run_git_command(self, args, print_output=True, fechas=None):
+        """Ejecuta comandos git; si fallan muestra el error y relanza ``GitError`` al llamador."""
+        command = self.git.describir(args)
+        inicio = time.perf_counter()
+        try:
+            if print_output:
+                self.output_insert(f"Ejecutando: {command}")
+            result = self.git.run(*args, env=fechas)
+            if args[0] == 'push':
+                self.push_segundos += time.perf_counter() - inicio
+            if print_output and result.stdout:
+                self.output_insert(result.stdout)
+            return result.stdout
+        except GitError as e:
+            self.output_insert(f"Error en comando: {command}\n")
+            self.output_insert(f"Detalles: {e.stderr}\n")
+            raise
+
+    def generar_fecha_aleatoria(self, mes, año):
+        """Genera fechas válidas considerando años bisiestos"""
+        if mes == 2:
+            bisiesto = (año % 4 == 0 and (año % 100 != 0 or año % 400 == 0))
+            return random.randint(1, 29 if bisiesto else 28)
+        dias_por_mes = {
+            1: 31, 3: 31, 4: 30, 5: 31, 6: 30,
+            7: 31, 8: 31, 9: 30, 10: 31, 11: 30, 12: 31
+        }
+        return random.randint(1, dias_por_mes.get(mes, 30))
+
+    def crear_pr(self, datos_pr):
+        """Crea un PR usando la API de GitHub"""
+        url = f"{GITHUB_API_URL}/repos/{os.getenv('REPO_OWNER')}/{os.getenv('REPO_NAME')}/pulls"
+        try:
+            response = self.api.crear_pr(url, datos_pr, os.getenv('REPO_OWNER'))
+            response.raise_for_status()
+            return response.json()['number']
+        except requests.exceptions.RequestException as e:
+            self._emit('error', error=str(e), rama=datos_pr['head'])
+            self.output_insert(f"Error creando PR: {str(e)}")
+            return None
+
+    def configurar_entorno_fechas(self, fecha):
+        """Configura variables de entorno para fechas específicas"""
+        fecha_str = fecha.strftime("%Y-%m-%d %H:%M:%S") + "-0500"
+        return {
+            'GIT_AUTHOR_DATE': fecha_str,
+            'GIT_COMMITTER_DATE': fecha_str
+        }
+
+    def crear_y_mergear_pr(self, mes, año, pr_num):
+        """Crea y mergea un PR con fecha histórica"""
+        dia = self.generar_fecha_aleatoria(mes, año)
+        hora = random.randint(9, 18)
+        minuto = random.randint(0, 59)
+        fecha_commit = datetime(año, mes, dia, hora, minuto)
+        
+        # Fechas históricas para el commit y el merge
+        fechas = self.configurar_entorno_fechas(fecha_commit)
+        
+        branch_name = f"pr/{fecha_commit.strftime('%Y%m%d')}-{pr_num:03d}"
+        
+        try:
+            # Configuración inicial
+            self.run_git_command(['checkout', self.base_branch], False)
+            if not self.bundle:
+                self.run_git_command(['pull', self.remote, self.base_branch], False)
+            
+            # Crear rama y commit
+            self.run_git_command(['checkout', '-b', branch_name], False, fechas)
+            with open(os.path.join(self.cwd or '.', 'historial.txt'), 'a') as f:
+                f.write(f"PR {pr_num} - {fecha_commit.isoformat()}\n")
+            
+            self.run_git_command(['add', 'historial.txt'], False, fechas)
+            commit_msg = f"PR {pr_num} - {fecha_commit.strftime('%Y-%m-%d %H:%M')}"
+            self.run_git_command(['commit', '-m', commit_msg], False, fechas)
+            self._emit('commit', sha=self.git.resolver('HEAD'), rama=branch_name, fecha=fecha_commit.isoformat())
+
+            if self.bundle:
+                # Sin conexión no hay PR en GitHub: solo el merge --no-ff de la rama
+                self.run_git_command(['checkout', self.base_branch], False, fechas)
+                merge_msg = f"Merge {branch_name} ({fecha_commit.strftime('%Y-%m-%d')})"
+                self.run_git_command(['merge', '--no-ff', branch_name, '-m', merge_msg], False, fechas)
+                self.prs_creados += 1
+                return
+            
+            # Push con fecha histórica
+            self.run_git_command(['push', '-u', self.remote, branch_name], False, fechas)
+            
+            # Crear PR
+            pr_data = {
+                "title": f"PR {pr_num} - {fecha_commit.strftime('%Y-%m')}",
+                "head": branch_name,
+                "base": self.base_branch,
+                "body": f"PR generado automáticamente\nFecha: {fecha_commit}"
+            }
+            pr_number = self.crear_pr(pr_data)
+            
+            if pr_number:
+                self.prs_creados += 1
+                self._emit('pr', numero=pr_number, rama=branch_name, fecha=fecha_commit.isoformat())
+                
+                # Realizar merge local con fecha histórica
+                self.run_git_command(['checkout', self.base_branch], False, fechas)
+                merge_msg = f"Merge PR #{pr_number} ({fecha_commit.strftime('%Y-%m-%d')})"
+                self.run_git_command(['merge', '--no-ff', branch_name, '-m', merge_msg], False, fechas)
+                
+                # Push del merge con fecha correcta
+                self.run_git_command(['push', self.remote, self.base_branch], False, fechas)
+        finally:
+            # Limpieza de ramas; si falla no debe ocultar el error que la provocó
+            try:
+                self.run_git_command(['checkout', self.base_branch], False)
+                self.git.actualizar_refs([(f'refs/heads/{branch_name}', None, None)])
+                if not self.bundle:
+                    self.run_git_command(['push', self.remote, '--delete', branch_name], False)
+            except GitError as e:
+                self._emit('error', error=e.stderr, rama=branch_name)
+
 
 class GitHubPRCreatorApp(tk.Tk):
     def __init__(self):
@@ -80,10 +259,19 @@ class GitHubPRCreatorApp(tk.Tk):
         self.entries['HORA_INICIO'] = self._create_spinbox(params_frame, "Hora inicio:", 0, 23)
         self.entries['HORA_FIN'] = self._create_spinbox(params_frame, "Hora fin:", 0, 23)
 
+        bundle_row = ttk.Frame(params_frame)
+        bundle_row.pack(fill=tk.X, pady=2)
+        ttk.Label(bundle_row, text="Bundle (opcional):", width=15).pack(side=tk.LEFT)
+        self.bundle = ttk.Entry(bundle_row)
+        self.bundle.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(bundle_row, text="...", width=3, command=self._elegir_bundle).pack(side=tk.LEFT, padx=2)
+
         exec_frame = ttk.Frame(main_frame)
         exec_frame.pack(fill=tk.X, pady=10)
         ttk.Button(exec_frame, text="Generar PRs", command=self._execute).pack(side=tk.LEFT, padx=5)
         ttk.Button(exec_frame, text="Limpiar Consola", command=self.clear_console).pack(side=tk.LEFT, padx=5)
+        ttk.Button(exec_frame, text="Reproducir Registro", command=self._replay_log).pack(side=tk.LEFT, padx=5)
+        ttk.Button(exec_frame, text="Limpiar Ramas pr/*", command=self._limpiar_ramas).pack(side=tk.LEFT, padx=5)
 
         self.output = scrolledtext.ScrolledText(
             main_frame,
@@ -105,7 +293,7 @@ class GitHubPRCreatorApp(tk.Tk):
 
     def _load_env_if_exists(self):
         if os.path.exists('.env'):
-            load_dotenv()
+            load_dotenv('.env')
             for key in self.entries:
                 if key in os.environ:
                     self.entries[key].insert(0, os.getenv(key))
@@ -118,7 +306,8 @@ class GitHubPRCreatorApp(tk.Tk):
                 'mes_inicio': int(self.entries['MES_INICIO'].get()),
                 'mes_fin': int(self.entries['MES_FIN'].get()),
                 'hora_inicio': int(self.entries['HORA_INICIO'].get()),
-                'hora_fin': int(self.entries['HORA_FIN'].get())
+                'hora_fin': int(self.entries['HORA_FIN'].get()),
+                'bundle': self.bundle.get().strip() or None
             }
 
             if data['prs_por_mes'] < 1 or data['prs_por_mes'] > 10:
@@ -138,7 +327,7 @@ class GitHubPRCreatorApp(tk.Tk):
         if not params:
             return
 
-        load_dotenv()
+        load_dotenv('.env')
         token = os.getenv('GITHUB_TOKEN')
         repo_owner = os.getenv('REPO_OWNER')
         repo_name = os.getenv('REPO_NAME')
@@ -149,16 +338,26 @@ class GitHubPRCreatorApp(tk.Tk):
             messagebox.showerror("Error", "Faltan variables en el archivo .env")
             return
 
+        self._eventos = EventLog('prs')
+        self._eventos.emit('inicio', **params)
+
         # Aquí empieza el proceso de creación y fusión de PRs, similar al script original
         print("🏁 Iniciando generación y merge de PRs históricos")
-        for mes in range(params['mes_inicio'], params['mes_fin'] + 1):
-            self.output_insert(f"\n📅 Procesando {mes:02d}/{params['año']}\n")
-            for pr_num in range(1, params['prs_por_mes'] + 1):
-                self.output_insert(f"🔄 Procesando PR {pr_num}/{params['prs_por_mes']}\n")
-                self.crear_y_mergear_pr(mes, params['año'], pr_num)
+        prs = PRManager(self.output_insert, self._eventos, base_branch=base_branch)
+        try:
+            prs.ejecutar(params)
+        except GitError as e:
+            self._eventos.emit('error', error=e.stderr)
+            self.output_insert(f"\n❌ Generación interrumpida: {e}\n")
+            return
+        finally:
+            self._eventos.emit('fin', prs=prs.prs_creados)
+            self._eventos.close()
 
-        self.output_insert("\n✅ Todos los PRs han sido mergeados correctamente\n")
-        self.output_insert("⚠️ Verifica en GitHub que los commits y merges muestren las fechas correctas\n")
+        self.output_insert(f"\n✅ PRs mergeados: {prs.prs_creados}\n")
+        self.output_insert(f"⚙️ Registro de eventos: {self._eventos.ruta}\n")
+        env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'BASE_BRANCH', 'REPO_URL')}
+        verificar_ejecucion(self._eventos.ruta, env_vars, self.output_insert)
 
     def output_insert(self, text: str):
         self.output.insert(tk.END, text)
@@ -169,120 +368,92 @@ class GitHubPRCreatorApp(tk.Tk):
         """Limpiar el área de texto de la consola"""
         self.output.delete(1.0, tk.END)
 
-    def run_git_command(self, command, print_output=True, custom_env=None):
-        """Ejecuta comandos git con manejo de errores mejorado"""
-        try:
-            if print_output:
-                self.output_insert(f"Ejecutando: {command}")
-            subprocess.run(
-                command,
-                shell=True,
-                check=True,
-                env=custom_env if custom_env else os.environ,
-                capture_output=not print_output
-            )
-        except subprocess.CalledProcessError as e:
-            self.output_insert(f"Error en comando: {command}")
-            self.output_insert(f"Detalles: {e.stderr.decode().strip()}")
-            exit()
-
-    def generar_fecha_aleatoria(self, mes, año):
-        """Genera fechas válidas considerando años bisiestos"""
-        if mes == 2:
-            bisiesto = (año % 4 == 0 and (año % 100 != 0 or año % 400 == 0))
-            return random.randint(1, 29 if bisiesto else 28)
-        dias_por_mes = {
-            1: 31, 3: 31, 4: 30, 5: 31, 6: 30,
-            7: 31, 8: 31, 9: 30, 10: 31, 11: 30, 12: 31
-        }
-        return random.randint(1, dias_por_mes.get(mes, 30))
+    def _limpiar_ramas(self):
+        """Elimina las ramas pr/* que quedaron en local y en el remoto."""
+        load_dotenv('.env')
+        env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'REPO_URL')}
+        if not all(env_vars[key] for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')):
+            messagebox.showerror("Error", "Faltan variables en el archivo .env")
+            return
+        if not messagebox.askyesno("Limpiar Ramas", "¿Eliminar todas las ramas pr/* locales y remotas?"):
+            return
 
-    def crear_pr(self, datos_pr):
-        """Crea un PR usando la API de GitHub"""
-        url = f"https://api.github.com/repos/{os.getenv('REPO_OWNER')}/{os.getenv('REPO_NAME')}/pulls"
-        headers = {
-            "Authorization": f"token {os.getenv('GITHUB_TOKEN')}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
+        self.clear_console()
+        self._eventos = EventLog('limpieza')
+        self._eventos.emit('inicio', ramas=True)
+        resultado = {}
         try:
-            response = requests.post(url, json=datos_pr, headers=headers)
-            response.raise_for_status()
-            return response.json()['number']
-        except requests.exceptions.RequestException as e:
-            self.output_insert(f"Error creando PR: {str(e)}")
-            return None
-
-    def configurar_entorno_fechas(self, fecha):
-        """Configura variables de entorno para fechas específicas"""
-        fecha_str = fecha.strftime("%Y-%m-%d %H:%M:%S") + "-0500"
-        return {
-            'GIT_AUTHOR_DATE': fecha_str,
-            'GIT_COMMITTER_DATE': fecha_str
-        }
-
-    def crear_y_mergear_pr(self, mes, año, pr_num):
-        """Crea y mergea un PR con fecha histórica"""
-        dia = self.generar_fecha_aleatoria(mes, año)
-        hora = random.randint(9, 18)
-        minuto = random.randint(0, 59)
-        fecha_commit = datetime(año, mes, dia, hora, minuto)
-        
-        # Configurar entorno con fechas
-        env_commit = os.environ.copy()
-        env_commit.update(self.configurar_entorno_fechas(fecha_commit))
-        
-        branch_name = f"pr/{fecha_commit.strftime('%Y%m%d')}-{pr_num:03d}"
-        
-        try:
-            # Configuración inicial
-            self.run_git_command('git checkout main', False)
-            self.run_git_command('git pull origin main', False)
-            
-            # Crear rama y commit
-            self.run_git_command(f'git checkout -b {branch_name}', False, env_commit)
-            with open('historial.txt', 'a') as f:
-                f.write(f"PR {pr_num} - {fecha_commit.isoformat()}\n")
-            
-            self.run_git_command('git add historial.txt', False, env_commit)
-            commit_msg = f"PR {pr_num} - {fecha_commit.strftime('%Y-%m-%d %H:%M')}"
-            self.run_git_command(f'git commit -m "{commit_msg}"', False, env_commit)
-            
-            # Push con fecha histórica
-            self.run_git_command(f'git push -u origin {branch_name}', False, env_commit)
-            
-            # Crear PR
-            pr_data = {
-                "title": f"PR {pr_num} - {fecha_commit.strftime('%Y-%m')}",
-                "head": branch_name,
-                "base": os.getenv('BASE_BRANCH'),
-                "body": f"PR generado automáticamente\nFecha: {fecha_commit}"
-            }
-            pr_number = self.crear_pr(pr_data)
-            
-            if pr_number:
-                # Merge con fecha histórica
-                merge_env = env_commit.copy()
-                
-                # Realizar merge local
-                self.run_git_command('git checkout main', False, merge_env)
-                merge_msg = f"Merge PR #{pr_number} ({fecha_commit.strftime('%Y-%m-%d')})"
-                self.run_git_command(
-                    f'git merge --no-ff {branch_name} -m "{merge_msg}"',
-                    False,
-                    merge_env
-                )
-                
-                # Push del merge con fecha correcta
-                self.run_git_command('git push origin main', False, merge_env)
+            resultado = Limpieza(env_vars, self.output_insert, self._eventos).limpiar_ramas()
+        except GitError as e:
+            self._eventos.emit('error', error=e.stderr)
+            self.output_insert(f"❌ {e.stderr}\n")
         finally:
-            # Limpieza de ramas
-            self.run_git_command('git checkout main', False)
-            self.run_git_command(f'git branch -D {branch_name}', False)
-            self.run_git_command(f'git push origin --delete {branch_name}', False)
+            self._eventos.emit('fin', **resultado)
+            self._eventos.close()
+        self.output_insert(f"⚙️ Registro de eventos: {self._eventos.ruta}\n")
+
+    def _elegir_bundle(self):
+        ruta = filedialog.asksaveasfilename(
+            title="Guardar historial como bundle",
+            defaultextension=".bundle",
+            filetypes=[("Git bundle", "*.bundle"), ("Todos", "*.*")]
+        )
+        if ruta:
+            self.bundle.delete(0, tk.END)
+            self.bundle.insert(0, ruta)
+
+    def _replay_log(self):
+        ruta = filedialog.askopenfilename(
+            title="Seleccionar registro de eventos",
+            filetypes=[("Registro de eventos", "*.jsonl *.jsonl.gz"), ("Todos", "*.*")]
+        )
+        if ruta:
+            self.clear_console()
+            reproducir(ruta, self.output_insert)
 
 
 # Ejecutando la aplicación
+
+def main(argv=None):
+    """Modo sin interfaz, usado por la cola de trabajos del lanzador."""
+    parser = argparse.ArgumentParser(description="Genera y mergea PRs históricos sin interfaz")
+    parser.add_argument('--prs', type=int, required=True, help="PRs por mes")
+    parser.add_argument('--año', type=int, default=datetime.now().year)
+    parser.add_argument('--mes-inicio', type=int, default=1)
+    parser.add_argument('--mes-fin', type=int, default=12)
+    parser.add_argument('--bundle', help="Mergea sin conexión y escribe el resultado en un bundle")
+    args = parser.parse_args(argv)
+
+    load_dotenv('.env')
+    if not all(os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'BASE_BRANCH', 'USER_EMAIL')):
+        print("❌ Faltan variables en el archivo .env")
+        return 1
+
+    params = {'prs_por_mes': args.prs, 'año': args.año, 'mes_inicio': args.mes_inicio,
+              'mes_fin': args.mes_fin, 'bundle': args.bundle}
+    eventos = EventLog('prs')
+    eventos.emit('inicio', **params)
+    prs = PRManager(lambda texto: print(texto, end='', flush=True), eventos)
+    try:
+        prs.ejecutar(params)
+    except GitError as e:
+        eventos.emit('error', error=e.stderr)
+        print(f"❌ Generación interrumpida: {e}")
+        return 1
+    finally:
+        eventos.emit('fin', prs=prs.prs_creados)
+        eventos.close()
+    esperados = args.prs * (args.mes_fin - args.mes_inicio + 1)
+    print(f"✅ PRs mergeados: {prs.prs_creados}/{esperados}")
+    print(f"⚙️ Registro de eventos: {eventos.ruta}")
+    env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'BASE_BRANCH', 'REPO_URL')}
+    coincide = verificar_ejecucion(eventos.ruta, env_vars, lambda texto: print(texto, end=''))
+    return 0 if prs.prs_creados == esperados and coincide else 1
+
+
 if __name__ == "__main__":
-    app = GitHubPRCreatorApp()
-    app.mainloop()
+    with perfilar('create_pr'):
+        if len(sys.argv) > 1:
+            sys.exit(main())
+        app = GitHubPRCreatorApp()
+        app.mainloop()
@@ -0,0 +1,215 @@
+"""Registro estructurado de eventos en JSONL escrito fuera del bucle principal.
+
+Cada herramienta crea un ``EventLog`` por ejecución. ``emit`` solo encola el
+evento; un hilo escritor lo serializa y escribe en lotes en
+``runs/<herramienta>-<fecha>/eventos.jsonl``, rotando a ``.jsonl.gz`` cuando el
+archivo supera el tamaño máximo. El registro puede reproducirse en la consola de
+las herramientas o resumirse desde el lanzador.
+"""
+import glob
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+RUNS_DIR = os.getenv('REPOSETUP_RUNS_DIR', 'runs')
+EVENT_LOG_MAX_BYTES = int(os.getenv('EVENT_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+EVENT_LOG_GZIP = os.getenv('EVENT_LOG_GZIP', '1') != '0'
+BATCH_SIZE = 512
+FLUSH_INTERVAL = 0.5
+
+EVENT_FILE = 'eventos.jsonl'
+
+_FIN = object()
+
+
+def crear_directorio_ejecucion(herramienta: str) -> str:
+    """Crea y devuelve el directorio de una ejecución nueva dentro de RUNS_DIR."""
+    base = os.path.join(RUNS_DIR, f"{herramienta}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    directorio = base
+    sufijo = 1
+    while os.path.exists(directorio):
+        sufijo += 1
+        directorio = f"{base}-{sufijo}"
+    os.makedirs(directorio)
+    return directorio
+
+
+class EventLog:
+    def __init__(self, herramienta: str, directorio: str = None,
+                 max_bytes: int = EVENT_LOG_MAX_BYTES, comprimir: bool = EVENT_LOG_GZIP):
+        self.herramienta = herramienta
+        self.run_id = uuid.uuid4().hex[:12]
+        self.directorio = directorio or crear_directorio_ejecucion(herramienta)
+        os.makedirs(self.directorio, exist_ok=True)
+        self.ruta = os.path.join(self.directorio, EVENT_FILE)
+        self.max_bytes = max_bytes
+        self.comprimir = comprimir
+        self._rotaciones = 0
+        self._cola = queue.SimpleQueue()
+        self._hilo = threading.Thread(target=self._escribir, name=f"eventlog-{herramienta}", daemon=True)
+        self._hilo.start()
+
+    def emit(self, evento: str, **campos):
+        """Encola un evento; la serialización y la escritura ocurren en el hilo escritor."""
+        campos.update(ts=time.time(), run=self.run_id, herramienta=self.herramienta, evento=evento)
+        self._cola.put(campos)
+
+    @contextmanager
+    def medir(self, evento: str, **campos):
+        """Emite ``evento`` con su duración en segundos al salir del bloque.
+
+        El bloque puede añadir campos al diccionario que recibe (p. ej. ``ok``).
+        """
+        inicio = time.perf_counter()
+        try:
+            yield campos
+        except Exception as e:
+            campos.setdefault('ok', False)
+            campos.setdefault('error', str(e))
+            raise
+        finally:
+            campos.setdefault('ok', True)
+            self.emit(evento, segundos=round(time.perf_counter() - inicio, 4), **campos)
+
+    def close(self):
+        """Vacía la cola pendiente y detiene el hilo escritor."""
+        if self._hilo.is_alive():
+            self._cola.put(_FIN)
+            self._hilo.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _escribir(self):
+        archivo = open(self.ruta, 'a', encoding='utf-8')
+        try:
+            terminado = False
+            while not terminado:
+                try:
+                    lote = [self._cola.get(timeout=FLUSH_INTERVAL)]
+                except queue.Empty:
+                    continue
+                while len(lote) < BATCH_SIZE:
+                    try:
+                        lote.append(self._cola.get_nowait())
+                    except queue.Empty:
+                        break
+                # Con emit concurrentes la marca de fin puede quedar en medio del lote
+                if any(evento is _FIN for evento in lote):
+                    lote = lote[:next(i for i, evento in enumerate(lote) if evento is _FIN)]
+                    terminado = True
+
+                lineas = []
+                for evento in lote:
+                    evento['ts'] = datetime.fromtimestamp(evento['ts']).isoformat(timespec='milliseconds')
+                    lineas.append(json.dumps(evento, ensure_ascii=False, default=str))
+                if lineas:
+                    archivo.write('\n'.join(lineas) + '\n')
+                    archivo.flush()
+
+                if self.max_bytes and archivo.tell() >= self.max_bytes:
+                    archivo.close()
+                    self._rotar()
+                    archivo = open(self.ruta, 'a', encoding='utf-8')
+        finally:
+            archivo.close()
+
+    def _rotar(self):
+        self._rotaciones += 1
+        base = os.path.join(self.directorio, f"eventos.{self._rotaciones:04d}.jsonl")
+        if self.comprimir:
+            with open(self.ruta, 'rb') as origen, gzip.open(base + '.gz', 'wb') as destino:
+                shutil.copyfileobj(origen, destino)
+            os.remove(self.ruta)
+        else:
+            os.replace(self.ruta, base)
+
+
+def _segmentos(ruta: str) -> list:
+    """Archivos de un registro en orden cronológico: rotados primero, activo al final."""
+    directorio = ruta if os.path.isdir(ruta) else os.path.dirname(ruta)
+    if not os.path.isdir(ruta) and not os.path.basename(ruta).startswith('eventos'):
+        return [ruta]
+    rotados = sorted(glob.glob(os.path.join(directorio, 'eventos.[0-9]*.jsonl*')))
+    activo = os.path.join(directorio, EVENT_FILE)
+    return rotados + ([activo] if os.path.exists(activo) else [])
+
+
+def leer_eventos(ruta: str):
+    """Genera los eventos de un registro (directorio de ejecución o archivo)."""
+    for segmento in _segmentos(ruta):
+        abrir = gzip.open if segmento.endswith('.gz') else open
+        with abrir(segmento, 'rt', encoding='utf-8') as f:
+            for linea in f:
+                if linea.strip():
+                    yield json.loads(linea)
+
+
+def formatear_evento(evento: dict) -> str:
+    hora = evento.get('ts', '')[11:23]
+    nombre = evento.get('evento', '?')
+    detalles = {k: v for k, v in evento.items() if k not in ('ts', 'run', 'herramienta', 'evento')}
+    marca = '❌' if detalles.get('ok') is False or nombre == 'error' else '•'
+    texto = ' '.join(f"{k}={v}" for k, v in detalles.items())
+    return f"{marca} [{hora}] {nombre} {texto}".rstrip()
+
+
+def resumir(eventos) -> dict:
+    """Agrega un flujo de eventos en contadores por tipo, errores y duración."""
+    resumen = {'eventos': 0, 'por_tipo': {}, 'errores': 0, 'segundos_comandos': 0.0,
+               'herramienta': None, 'inicio': None, 'fin': None}
+    for evento in eventos:
+        resumen['eventos'] += 1
+        nombre = evento.get('evento')
+        resumen['por_tipo'][nombre] = resumen['por_tipo'].get(nombre, 0) + 1
+        if evento.get('ok') is False or nombre == 'error':
+            resumen['errores'] += 1
+        if nombre in ('comando', 'api'):
+            resumen['segundos_comandos'] += evento.get('segundos', 0)
+        resumen['herramienta'] = resumen['herramienta'] or evento.get('herramienta')
+        resumen['inicio'] = resumen['inicio'] or evento.get('ts')
+        resumen['fin'] = evento.get('ts')
+    resumen['segundos_comandos'] = round(resumen['segundos_comandos'], 3)
+    return resumen
+
+
+def formatear_resumen(resumen: dict) -> str:
+    lineas = [
+        f"Herramienta: {resumen['herramienta']}",
+        f"Inicio: {resumen['inicio']}",
+        f"Fin: {resumen['fin']}",
+        f"Eventos: {resumen['eventos']} (errores: {resumen['errores']})",
+        f"Tiempo en comandos/API: {resumen['segundos_comandos']}s",
+    ]
+    lineas += [f"  {nombre}: {total}" for nombre, total in sorted(resumen['por_tipo'].items())]
+    return '\n'.join(lineas)
+
+
+def reproducir(ruta: str, output_insert) -> dict:
+    """Reproduce un registro en una consola (función ``output_insert``) y devuelve su resumen."""
+    def con_eco():
+        for evento in leer_eventos(ruta):
+            output_insert(formatear_evento(evento) + '\n')
+            yield evento
+
+    resumen = resumir(con_eco())
+    output_insert(f"\n{'═' * 50}\n{formatear_resumen(resumen)}\n")
+    return resumen
+
+
+def ocultar_token(texto: str, token: str) -> str:
+    """Evita que el token de GitHub termine en el registro."""
+    if token:
+        texto = texto.replace(token, '***')
+    return re.sub(r'(https://[^:/\s]+:)[^@\s]+@', r'\1***@', texto)
@@ -0,0 +1,123 @@
+"""Exportación e importación de historiales generados como ``git bundle``.
+
+Los motores de commits y PRs pueden trabajar sin conexión y escribir el
+resultado en un bundle que solo contiene los objetos nuevos respecto a la ref
+base (su prerrequisito). En la máquina con acceso a GitHub, ``importar``
+verifica el bundle, avanza la rama solo si es un fast-forward y hace push.
+
+Uso:
+    python git_bundle.py exportar historial.bundle --rama main --base origin/main
+    python git_bundle.py importar historial.bundle --rama main
+"""
+import argparse
+import os
+import sys
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from git_executor import GitError, GitExecutor, repo_url_de
+from profiling import perfilar
+
+BUNDLE_REF_PREFIX = 'refs/bundles/'
+
+
+class BundleError(Exception):
+    pass
+
+
+def exportar(executor: GitExecutor, ruta: str, rama: str, base: Optional[str] = None) -> str:
+    """Escribe ``base..rama`` en ``ruta`` en una sola pasada y devuelve el SHA exportado.
+
+    Sin ``base`` el bundle contiene el historial completo de la rama.
+    """
+    tip = executor.resolver(f'refs/heads/{rama}')
+    if tip is None:
+        raise BundleError(f"La rama {rama} no existe")
+    base_sha = executor.resolver(base) if base else None
+    if base and base_sha is None:
+        raise BundleError(f"La ref base {base} no existe")
+    if base_sha == tip:
+        raise BundleError(f"La rama {rama} no tiene commits nuevos respecto a {base}")
+
+    rango = f'{base_sha}..refs/heads/{rama}' if base_sha else f'refs/heads/{rama}'
+    executor.run('bundle', 'create', '-q', os.path.abspath(ruta), rango)
+    executor.run('bundle', 'verify', '-q', os.path.abspath(ruta))
+    return tip
+
+
+def importar(executor: GitExecutor, ruta: str, rama: str, repo_url: Optional[str] = None) -> str:
+    """Verifica el bundle, avanza ``rama`` por fast-forward y, si se indica, hace push a ``repo_url``."""
+    ruta = os.path.abspath(ruta)
+    try:
+        executor.run('bundle', 'verify', '-q', ruta)
+    except GitError as e:
+        raise BundleError(f"El bundle no es válido para este repositorio: {e.stderr}") from e
+
+    temporal = f'{BUNDLE_REF_PREFIX}{rama}'
+    executor.run('fetch', '-q', ruta, f'+refs/heads/{rama}:{temporal}')
+    try:
+        nuevo = executor.resolver(temporal)
+        actual = executor.resolver(f'refs/heads/{rama}')
+
+        def es_ancestro(a, b):
+            return executor.run('merge-base', '--is-ancestor', a, b, check=False).returncode == 0
+
+        if actual and es_ancestro(nuevo, actual):
+            # El bundle ya estaba importado: no hay nada que avanzar
+            nuevo = actual
+        elif actual and not es_ancestro(actual, nuevo):
+            raise BundleError(f"El bundle no es un fast-forward de {rama}")
+
+        if nuevo != actual:
+            actual_checkout = executor.run('symbolic-ref', '-q', '--short', 'HEAD', check=False).stdout.strip()
+            if actual_checkout == rama:
+                executor.run('merge', '--ff-only', '-q', nuevo)
+            else:
+                executor.actualizar_refs([(f'refs/heads/{rama}', nuevo, actual)])
+    finally:
+        executor.actualizar_refs([(temporal, None, None)])
+
+    if repo_url:
+        executor.run('push', repo_url, f'refs/heads/{rama}:refs/heads/{rama}')
+    return nuevo
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta o importa historiales generados como git bundle")
+    sub = parser.add_subparsers(dest='accion', required=True)
+
+    exp = sub.add_parser('exportar', help="Escribe los commits nuevos de una rama en un bundle")
+    exp.add_argument('ruta')
+    exp.add_argument('--rama', default='main')
+    exp.add_argument('--base', help="Ref que el destino ya tiene (prerrequisito del bundle)")
+
+    imp = sub.add_parser('importar', help="Verifica un bundle, avanza la rama y hace push")
+    imp.add_argument('ruta')
+    imp.add_argument('--rama', default='main')
+    imp.add_argument('--sin-push', action='store_true', help="Solo actualiza la rama local")
+    args = parser.parse_args(argv)
+
+    load_dotenv('.env')
+    token = os.getenv('GITHUB_TOKEN')
+    with GitExecutor(env={'GITHUB_TOKEN': token or ''}, token=token) as executor:
+        try:
+            if args.accion == 'exportar':
+                sha = exportar(executor, args.ruta, args.rama, args.base)
+                print(f"✅ Bundle {args.ruta} con {args.rama} en {sha[:10]}")
+            else:
+                repo_url = None
+                if not args.sin_push:
+                    env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'REPO_URL')}
+                    repo_url = repo_url_de(env_vars)
+                sha = importar(executor, args.ruta, args.rama, repo_url)
+                print(f"✅ {args.rama} avanzada a {sha[:10]}" + ("" if args.sin_push else " y enviada"))
+        except (BundleError, GitError) as e:
+            print(f"❌ {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    with perfilar('git_bundle'):
+        sys.exit(main())
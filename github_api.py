@@ -0,0 +1,236 @@
+"""Cliente de la API de GitHub con tiempos máximos, reintentos acotados y cortacircuitos.
+
+Todas las solicitudes llevan tiempo máximo de conexión y de lectura. Los fallos
+transitorios (errores de conexión, timeouts, 5xx y límites de uso) se
+reintentan con espera exponencial con jitter mientras quede presupuesto: cada
+ejecución crea un ``GitHubAPI`` y todos sus reintentos salen de un presupuesto
+común. Antes de repetir un POST cuyo resultado se desconoce se comprueba si el
+recurso ya se creó, para no duplicar issues ni PRs. Si la tasa de errores se
+dispara, el cortacircuitos pausa el lote antes de seguir enviando.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Optional
+
+import requests
+
+GITHUB_API_URL = 'https://api.github.com'
+
+API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '5'))
+API_READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', '30'))
+# Reintentos por solicitud y reintentos totales por ejecución
+API_REINTENTOS = int(os.getenv('API_REINTENTOS', '3'))
+API_PRESUPUESTO = int(os.getenv('API_PRESUPUESTO', '50'))
+API_ESPERA_BASE = 0.5
+API_ESPERA_MAX = 30.0
+
+# El circuito se abre si en las últimas CIRCUITO_VENTANA respuestas fallan al menos CIRCUITO_UMBRAL
+CIRCUITO_VENTANA = 20
+CIRCUITO_MINIMO = 10
+CIRCUITO_UMBRAL = 0.5
+CIRCUITO_PAUSA = float(os.getenv('CIRCUITO_PAUSA', '30'))
+
+REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+def en_ventana(funcion: Callable[[Any], Any], elementos: Iterable, ventana: int,
+               completar: Callable[[Future, Any], None]):
+    """Llama a ``funcion(elemento)`` en un pool con como máximo ``ventana`` llamadas en vuelo.
+
+    ``completar(futuro, elemento)`` procesa cada resultado en el hilo que llama
+    (así no se toca la interfaz desde el pool). Aunque recorrer ``elementos``
+    falle, las llamadas ya enviadas se completan antes de propagar el error.
+    """
+    with ThreadPoolExecutor(max_workers=ventana) as pool:
+        en_vuelo = {}
+
+        def completar_hechos():
+            hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                completar(futuro, en_vuelo.pop(futuro))
+
+        try:
+            for elemento in elementos:
+                if len(en_vuelo) >= ventana:
+                    completar_hechos()
+                en_vuelo[pool.submit(funcion, elemento)] = elemento
+        finally:
+            while en_vuelo:
+                completar_hechos()
+
+
+class CircuitBreaker:
+    def __init__(self, ventana: int = CIRCUITO_VENTANA, minimo: int = CIRCUITO_MINIMO,
+                 umbral: float = CIRCUITO_UMBRAL, pausa: float = CIRCUITO_PAUSA):
+        self.minimo = minimo
+        self.umbral = umbral
+        self.pausa = pausa
+        self.aperturas = 0
+        self._resultados = deque(maxlen=ventana)
+        self._abierto_hasta = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self, ok: bool) -> bool:
+        """Anota un resultado; devuelve True si con él se abre el circuito."""
+        with self._lock:
+            self._resultados.append(ok)
+            fallos = self._resultados.count(False)
+            if len(self._resultados) >= self.minimo and fallos / len(self._resultados) >= self.umbral:
+                self._resultados.clear()
+                self._abierto_hasta = time.monotonic() + self.pausa
+                self.aperturas += 1
+                return True
+            return False
+
+    def esperar(self):
+        """Bloquea mientras el circuito está abierto; así se pausa todo el lote."""
+        while True:
+            with self._lock:
+                restante = self._abierto_hasta - time.monotonic()
+            if restante <= 0:
+                return
+            time.sleep(restante)
+
+
+class GitHubAPI:
+    def __init__(self, token: str, eventos=None, output_insert: Optional[Callable[[str], None]] = None,
+                 presupuesto: int = API_PRESUPUESTO):
+        self.eventos = eventos
+        self.output_insert = output_insert
+        self.presupuesto = presupuesto
+        self.reintentos = 0
+        self.circuito = CircuitBreaker()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f"token {token}",
+            'Accept': 'application/vnd.github.v3+json'
+        })
+        self._lock = threading.Lock()
+
+    def _emit(self, evento: str, **campos):
+        if self.eventos:
+            self.eventos.emit(evento, **campos)
+
+    def _avisar(self, texto: str):
+        if self.output_insert:
+            self.output_insert(texto)
+
+    def _gastar_reintento(self) -> bool:
+        with self._lock:
+            if self.reintentos >= self.presupuesto:
+                return False
+            self.reintentos += 1
+            return True
+
+    def _espera(self, intento: int, response: Optional[requests.Response]) -> float:
+        """Espera exponencial con jitter completo; respeta ``Retry-After`` si GitHub lo envía."""
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return min(float(response.headers['Retry-After']), API_ESPERA_MAX)
+        return random.uniform(0, min(API_ESPERA_MAX, API_ESPERA_BASE * 2 ** intento))
+
+    @staticmethod
+    def _reintentable(response: requests.Response) -> bool:
+        if response.status_code in REINTENTABLES:
+            return True
+        # Límite secundario de GitHub: 403 con Retry-After o sin peticiones restantes
+        return response.status_code == 403 and (
+            'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+
+    def solicitud(self, metodo: str, url: str, existente: Optional[Callable[[], Optional[dict]]] = None,
+                  **kwargs) -> requests.Response:
+        """Solicitud con reintentos; si no quedan, devuelve la última respuesta o relanza el último error.
+
+        Para un POST, ``existente`` busca el recurso por si la solicitud anterior
+        llegó a crearlo. Sin ella, un POST con resultado desconocido no se repite.
+        """
+        kwargs.setdefault('timeout', (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+        intento = 0
+        while True:
+            self.circuito.esperar()
+            inicio = time.perf_counter()
+            response, error, enviado = None, None, True
+            try:
+                response = self.session.request(metodo, url, **kwargs)
+            except requests.exceptions.ConnectTimeout as e:
+                error, enviado = e, False
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = e
+            ok = response is not None and not self._reintentable(response)
+            self._emit('api', metodo=metodo, url=url, status=response.status_code if response is not None else None,
+                       ok=response is not None and response.ok, segundos=round(time.perf_counter() - inicio, 4),
+                       intento=intento, **({'error': str(error)} if error else {}))
+            if self.circuito.registrar(ok):
+                self._emit('circuito', pausa=self.circuito.pausa, aperturas=self.circuito.aperturas)
+                self._avisar(f"⏸️ Demasiados errores de la API: pausa de {self.circuito.pausa:.0f}s\n")
+            if ok:
+                return response
+
+            # Un POST que pudo llegar a GitHub (timeout de lectura, conexión cortada o 5xx) solo se repite tras comprobarlo
+            ambiguo = metodo == 'POST' and enviado and (response is None or response.status_code >= 500)
+            if ambiguo and existente is None:
+                return self._fallo(response, error)
+            if intento >= API_REINTENTOS or not self._gastar_reintento():
+                return self._fallo(response, error)
+            espera = self._espera(intento, response)
+            self._emit('reintento', metodo=metodo, url=url, intento=intento + 1, espera=round(espera, 2))
+            time.sleep(espera)
+            if ambiguo:
+                self.circuito.esperar()
+                try:
+                    recurso = existente()
+                except requests.exceptions.RequestException as e:
+                    # Sin poder comprobarlo se repite el POST; el siguiente reintento vuelve a buscarlo antes
+                    self._emit('error', error=f"Comprobación de duplicados: {e}", url=url)
+                    recurso = None
+                if recurso:
+                    self._emit('idempotencia', url=recurso['url'])
+                    # El recurso ya existe: se devuelve con su propia respuesta en lugar de duplicarlo
+                    return self.solicitud('GET', recurso['url'])
+            intento += 1
+
+    @staticmethod
+    def _fallo(response: Optional[requests.Response], error: Optional[Exception]) -> requests.Response:
+        if response is None:
+            raise error
+        return response
+
+    def paginas(self, url: str, params: Optional[dict] = None):
+        """Recorre una lista paginada siguiendo el enlace ``next``."""
+        while url:
+            response = self.solicitud('GET', url, params=params)
+            response.raise_for_status()
+            yield from response.json()
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    def crear_issue(self, url: str, datos: dict) -> requests.Response:
+        """POST de un issue; antes de repetirlo busca uno con el mismo título y cuerpo creado desde el envío."""
+        desde = (datetime.now(timezone.utc) - timedelta(minutes=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        def existente():
+            respuesta = self.solicitud('GET', url, params={
+                'state': 'all', 'since': desde, 'sort': 'created', 'direction': 'desc', 'per_page': 100
+            })
+            if not respuesta.ok:
+                return None
+            return next((
+                issue for issue in respuesta.json()
+                if 'pull_request' not in issue and issue['title'] == datos['title']
+                and (issue.get('body') or '') == (datos.get('body') or '')
+            ), None)
+
+        return self.solicitud('POST', url, existente=existente, json=datos)
+
+    def crear_pr(self, url: str, datos: dict, owner: str) -> requests.Response:
+        """POST de un PR; antes de repetirlo busca un PR de la misma rama."""
+        def existente():
+            respuesta = self.solicitud('GET', url, params={'head': f"{owner}:{datos['head']}", 'state': 'all'})
+            return next(iter(respuesta.json()), None) if respuesta.ok else None
+
+        return self.solicitud('POST', url, existente=existente, json=datos)
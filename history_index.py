@@ -0,0 +1,87 @@
+"""Índice persistente de commits por día para completar historiales existentes.
+
+La primera vez se recorre el historial con un único ``git log``; después solo
+se indexan los commits nuevos desde el último SHA indexado, de modo que
+reindexar tras una ejecución cuesta milisegundos. El índice se guarda en SQLite
+dentro del directorio ``.git`` del repositorio para que nunca se versione.
+"""
+import os
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from git_executor import GitExecutor
+
+INDEX_FILE = 'reposetup-historial.sqlite'
+
+
+class HistoryIndex:
+    def __init__(self, executor: GitExecutor, ruta: Optional[str] = None):
+        self.executor = executor
+        if ruta is None:
+            git_dir = executor.run('rev-parse', '--absolute-git-dir').stdout.strip()
+            ruta = os.path.join(git_dir, INDEX_FILE)
+        self.ruta = ruta
+        self.db = sqlite3.connect(ruta)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS dias (fecha TEXT PRIMARY KEY, commits INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _meta(self, clave: str) -> Optional[str]:
+        fila = self.db.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def actualizar(self, ref: str = 'HEAD') -> int:
+        """Indexa los commits de ``ref`` que faltan y devuelve cuántos se añadieron.
+
+        Si el último SHA indexado ya no es ancestro de ``ref`` (historial
+        reescrito) el índice se reconstruye desde cero.
+        """
+        cabeza = self.executor.resolver(ref)
+        if cabeza is None:
+            return 0
+        ultimo = self._meta('ultimo_sha')
+        if ultimo == cabeza:
+            return 0
+
+        incremental = ultimo and self.executor.run(
+            'merge-base', '--is-ancestor', ultimo, cabeza, check=False
+        ).returncode == 0
+        rango = f'{ultimo}..{cabeza}' if incremental else cabeza
+
+        fechas = self.executor.run('log', '--format=%ad', '--date=short', rango).stdout.split()
+        por_dia = Counter(fechas)
+        with self.db:
+            if not incremental:
+                self.db.execute("DELETE FROM dias")
+            self.db.executemany(
+                "INSERT INTO dias (fecha, commits) VALUES (?, ?) "
+                "ON CONFLICT(fecha) DO UPDATE SET commits = commits + excluded.commits",
+                por_dia.items()
+            )
+            self.db.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('ultimo_sha', ?)", (cabeza,))
+        return len(fechas)
+
+    def por_mes(self, año: int) -> Dict[int, int]:
+        """Commits indexados por mes del año indicado."""
+        filas = self.db.execute(
+            "SELECT CAST(substr(fecha, 6, 2) AS INTEGER), SUM(commits) FROM dias "
+            "WHERE fecha LIKE ? GROUP BY 1",
+            (f'{año:04d}-%',)
+        )
+        return dict(filas)
+
+    def faltantes(self, año: int, meses: Iterable[int], minimo: int) -> Dict[int, int]:
+        """Commits que faltan en cada mes para llegar a ``minimo``."""
+        existentes = self.por_mes(año)
+        return {mes: max(0, minimo - existentes.get(mes, 0)) for mes in meses}
@@ -0,0 +1,182 @@
+"""Cola de trabajos del lanzador con límites separados para git y para la API.
+
+Cada trabajo es una herramienta con sus argumentos y se ejecuta en modo sin
+interfaz como proceso hijo, dentro del directorio de su repositorio (donde está
+su ``.env``). El planificador arranca en orden los trabajos pendientes que
+caben en su clase. Los trabajos de git y los de la API tienen límites propios,
+así que la API avanza mientras git trabaja. Dos trabajos de git nunca comparten
+el mismo repositorio. La salida de cada trabajo se lee mientras se ejecuta con
+un ``OutputSpool`` y se guarda completa en ``runs/trabajo-N-<fecha>/salida.log``.
+"""
+import itertools
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from event_log import RUNS_DIR
+from output_spool import OutputSpool, lanzar
+
+JOBS_GIT = int(os.getenv('JOBS_GIT', '2'))
+JOBS_API = int(os.getenv('JOBS_API', '4'))
+
+# Caracteres finales de la salida que se conservan para mostrar el error
+SALIDA_MAX = 4000
+
+PENDIENTE = 'pendiente'
+EJECUTANDO = 'ejecutando'
+COMPLETADO = 'completado'
+FALLIDO = 'fallido'
+CANCELADO = 'cancelado'
+
+
+class Herramienta(NamedTuple):
+    modulo: str
+    tipo: str
+    argumentos: tuple
+    ejemplo: str
+
+
+HERRAMIENTAS: Dict[str, Herramienta] = {
+    'Commits': Herramienta('create_commits', 'git', (), '--commits 20 --año 2024 --mes-inicio 1 --mes-fin 12'),
+    'PRs': Herramienta('create_pr', 'git', (), '--prs 4 --año 2024 --mes-inicio 1 --mes-fin 12'),
+    'Issues': Herramienta('create_issues', 'api', (), '--total 10   o   --importar issues.csv'),
+    'Unificado': Herramienta('scheduler', 'git', (), '--año 2024 --commits 20 --prs 4 --issues 2'),
+    'Cerrar issues generados': Herramienta('cleanup', 'api', ('--solo-issues',), '--patron "^Issue \\d+"'),
+    'Limpiar ramas pr/*': Herramienta('cleanup', 'git', ('--solo-ramas',), '--simular'),
+    'Importar bundle': Herramienta('git_bundle', 'git', ('importar',), 'historial.bundle --rama main'),
+    'Verificar ejecución': Herramienta('verify', 'git', (), 'runs/commits-20240101-120000'),
+}
+
+
+def raiz_repositorio(ruta: str) -> str:
+    """Directorio de trabajo git que contiene ``ruta``; dos trabajos de git no lo comparten."""
+    actual = os.path.realpath(ruta)
+    while True:
+        if os.path.exists(os.path.join(actual, '.git')):
+            return actual
+        padre = os.path.dirname(actual)
+        if padre == actual:
+            return os.path.realpath(ruta)
+        actual = padre
+
+
+class Job:
+    def __init__(self, numero: int, herramienta: str, argv: List[str], repo: str, tipo: str):
+        self.numero = numero
+        self.herramienta = herramienta
+        self.argv = argv
+        self.repo = repo
+        self.tipo = tipo
+        self.raiz = raiz_repositorio(repo)
+        self.estado = PENDIENTE
+        # Independiente del estado: un trabajo cancelado sigue ocupando su repositorio hasta que el hijo termina
+        self.en_curso = False
+        self.inicio: Optional[float] = None
+        self.fin: Optional[float] = None
+        self.codigo: Optional[int] = None
+        self.error = ''
+        self.spool: Optional[OutputSpool] = None
+
+    @property
+    def segundos(self) -> float:
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.monotonic()) - self.inicio
+
+    @property
+    def salida(self) -> str:
+        """Final de la salida para mostrar el error; la salida completa está en ``spool.ruta``."""
+        if self.spool is None:
+            return self.error
+        return self.spool.cola(SALIDA_MAX) + (f"\n{self.error}" if self.error else '')
+
+
+class JobQueue:
+    def __init__(self, limite_git: int = JOBS_GIT, limite_api: int = JOBS_API):
+        self.limites = {'git': limite_git, 'api': limite_api}
+        self.trabajos: List[Job] = []
+        self.en_marcha = False
+        self._lock = threading.Lock()
+        self._numeros = itertools.count(1)
+
+    def agregar(self, herramienta: str, argv: List[str], repo: str, tipo: str) -> Job:
+        job = Job(next(self._numeros), herramienta, argv, repo, tipo)
+        with self._lock:
+            self.trabajos.append(job)
+        self.planificar()
+        return job
+
+    def quitar(self, job: Job) -> bool:
+        """Quita un trabajo cuyo proceso ya terminó."""
+        with self._lock:
+            if job.en_curso:
+                return False
+            self.trabajos.remove(job)
+            return True
+
+    def cancelar(self, job: Job):
+        with self._lock:
+            if job.estado == PENDIENTE:
+                job.estado = CANCELADO
+            elif job.estado == EJECUTANDO:
+                job.estado = CANCELADO
+                if job.spool:
+                    job.spool.proceso.terminate()
+
+    def iniciar(self):
+        self.en_marcha = True
+        self.planificar()
+
+    def pausar(self):
+        """Deja de arrancar trabajos; los que están en ejecución terminan normalmente."""
+        self.en_marcha = False
+
+    def activos(self) -> bool:
+        return any(job.estado == PENDIENTE or job.en_curso for job in self.trabajos)
+
+    def planificar(self) -> List[Job]:
+        """Arranca, en orden de llegada, los pendientes que caben en su límite."""
+        if not self.en_marcha:
+            return []
+        arrancados = []
+        with self._lock:
+            ejecutando = [job for job in self.trabajos if job.en_curso]
+            for job in self.trabajos:
+                if job.estado != PENDIENTE:
+                    continue
+                if sum(1 for otro in ejecutando if otro.tipo == job.tipo) >= self.limites[job.tipo]:
+                    continue
+                if job.tipo == 'git' and any(otro.tipo == 'git' and otro.raiz == job.raiz for otro in ejecutando):
+                    continue
+                job.estado = EJECUTANDO
+                job.en_curso = True
+                job.inicio = time.monotonic()
+                ejecutando.append(job)
+                arrancados.append(job)
+        for job in arrancados:
+            threading.Thread(target=self._ejecutar, args=(job,), daemon=True).start()
+        return arrancados
+
+    def _ejecutar(self, job: Job):
+        try:
+            job.spool = lanzar(
+                job.argv, f"trabajo-{job.numero}",
+                cwd=job.repo,
+                # Los registros van al directorio del lanzador y no ensucian el repositorio del trabajo
+                env={**os.environ, 'REPOSETUP_RUNS_DIR': os.path.abspath(RUNS_DIR)}
+            )
+            if job.estado == CANCELADO:
+                job.spool.proceso.terminate()
+            job.codigo = job.spool.esperar()
+        except Exception as e:
+            # Cualquier fallo marca el trabajo como fallido; si no, su repositorio quedaría bloqueado
+            job.codigo = -1
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                job.fin = time.monotonic()
+                job.en_curso = False
+                if job.estado != CANCELADO:
+                    job.estado = COMPLETADO if job.codigo == 0 else FALLIDO
+            self.planificar()
@@ -0,0 +1,91 @@
+"""Lectura incremental de la salida de un proceso hijo con memoria acotada.
+
+Un hilo lector consume la salida del hijo línea a línea mientras se ejecuta:
+cada línea se escribe completa en ``salida.log`` dentro de un directorio de
+ejecución y se guarda en una cola de las últimas ``SALIDA_LINEAS`` líneas. La
+consola del lanzador lee de esa cola las líneas nuevas desde su última
+posición, así que el consumo de memoria no depende de cuánto escriba el hijo.
+"""
+import itertools
+import os
+import subprocess
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+from event_log import crear_directorio_ejecucion
+
+SALIDA_LINEAS = int(os.getenv('SALIDA_LINEAS', '2000'))
+
+# Las líneas más largas (p. ej. barras de progreso sin salto) se parten en trozos
+MAX_LINEA = 8192
+
+SALIDA_FILE = 'salida.log'
+
+
+class OutputSpool:
+    def __init__(self, proceso: subprocess.Popen, nombre: str, directorio: Optional[str] = None,
+                 max_lineas: int = SALIDA_LINEAS):
+        self.proceso = proceso
+        self.directorio = directorio or crear_directorio_ejecucion(nombre)
+        self.ruta = os.path.join(self.directorio, SALIDA_FILE)
+        self.total = 0
+        self._cola = deque(maxlen=max_lineas)
+        self._lock = threading.Lock()
+        self._hilo = threading.Thread(target=self._leer, name=f"salida-{nombre}", daemon=True)
+        self._hilo.start()
+
+    def _leer(self):
+        # Con buffering=1 cada línea llega al disco al escribirse
+        with open(self.ruta, 'w', encoding='utf-8', buffering=1) as archivo:
+            for linea in iter(lambda: self.proceso.stdout.readline(MAX_LINEA), ''):
+                archivo.write(linea)
+                with self._lock:
+                    self._cola.append(linea)
+                    self.total += 1
+        self.proceso.stdout.close()
+
+    def leer_desde(self, posicion: int) -> Tuple[List[str], int, int]:
+        """Líneas nuevas desde ``posicion``, líneas que ya salieron de la cola y nueva posición."""
+        with self._lock:
+            primera = self.total - len(self._cola)
+            omitidas = max(0, primera - posicion)
+            nuevas = list(itertools.islice(self._cola, max(0, posicion - primera), None))
+            return nuevas, omitidas, self.total
+
+    def cola(self, max_caracteres: Optional[int] = None) -> str:
+        """Final de la salida que sigue en memoria."""
+        with self._lock:
+            texto = ''.join(self._cola)
+        return texto[-max_caracteres:] if max_caracteres else texto
+
+    def terminado(self) -> bool:
+        return not self._hilo.is_alive()
+
+    def esperar(self) -> int:
+        """Espera a que el hijo termine y a que su salida esté leída; devuelve el código de salida."""
+        codigo = self.proceso.wait()
+        self._hilo.join()
+        return codigo
+
+
+def lanzar(argv: List[str], nombre: str, **kwargs) -> OutputSpool:
+    """Lanza ``argv`` con stdout y stderr combinados y sin búfer, leídos por un ``OutputSpool``."""
+    directorio = crear_directorio_ejecucion(nombre)
+    entorno = {**(kwargs.pop('env', None) or os.environ), 'PYTHONIOENCODING': 'utf-8', 'PYTHONUNBUFFERED': '1'}
+    try:
+        proceso = subprocess.Popen(
+            argv,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            env=entorno,
+            **kwargs
+        )
+    except OSError:
+        os.rmdir(directorio)
+        raise
+    return OutputSpool(proceso, nombre, directorio)
@@ -0,0 +1,119 @@
+"""Perfilado opcional de CPU y memoria de las herramientas.
+
+Con ``REPOSETUP_PROFILE=1`` (o desde **Ayuda > Perfilado** en el lanzador, que
+lo activa para las herramientas que se abran después) cada herramienta se
+ejecuta con ``cProfile`` en su hilo principal (el de Tk en las interfaces) y
+con ``tracemalloc``. Cada ``REPOSETUP_PROFILE_INTERVALO`` segundos se toma una
+instantánea de memoria y se escriben las ``PROFILE_TOP`` líneas de código cuya
+memoria más creció desde la anterior. Todo va a ``runs/perfil-<herramienta>-<fecha>``:
+
+- ``memoria-NNNN.txt``: diferencia de asignaciones de cada instantánea;
+- ``cpu.pstats``: perfil de CPU para ``pstats`` o snakeviz;
+- ``cpu.txt``: las funciones con más tiempo acumulado.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+from event_log import crear_directorio_ejecucion
+
+PROFILE = os.getenv('REPOSETUP_PROFILE', '0') != '0'
+PROFILE_INTERVALO = float(os.getenv('REPOSETUP_PROFILE_INTERVALO', '30'))
+PROFILE_TOP = int(os.getenv('REPOSETUP_PROFILE_TOP', '25'))
+
+# Marcos de pila guardados por asignación; con más se distingue mejor el origen, pero cuesta más memoria
+PROFILE_FRAMES = 5
+
+# Las asignaciones del propio perfilado no interesan
+FILTROS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+]
+
+
+class Profiler:
+    def __init__(self, herramienta: str, directorio: Optional[str] = None,
+                 intervalo: float = PROFILE_INTERVALO, top: int = PROFILE_TOP):
+        self.herramienta = herramienta
+        self.directorio = directorio or crear_directorio_ejecucion(f"perfil-{herramienta}")
+        self.intervalo = intervalo
+        self.top = top
+        self.instantaneas = 0
+        self._cpu = cProfile.Profile()
+        self._anterior: Optional[tracemalloc.Snapshot] = None
+        self._inicio = 0.0
+        self._parar = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name=f"perfil-{herramienta}", daemon=True)
+
+    def iniciar(self) -> 'Profiler':
+        """Empieza a perfilar; el perfil de CPU cubre el hilo desde el que se llama."""
+        self._inicio = time.monotonic()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_FRAMES)
+        self._anterior = self._instantanea()
+        self._cpu.enable()
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        """Escribe el perfil de CPU y una última diferencia de memoria."""
+        self._cpu.disable()
+        self._parar.set()
+        self._hilo.join()
+        self._escribir_memoria()
+        tracemalloc.stop()
+
+        ruta = os.path.join(self.directorio, 'cpu.pstats')
+        self._cpu.dump_stats(ruta)
+        texto = io.StringIO()
+        pstats.Stats(ruta, stream=texto).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        with open(os.path.join(self.directorio, 'cpu.txt'), 'w', encoding='utf-8') as f:
+            f.write(texto.getvalue())
+
+    def _instantanea(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(FILTROS)
+
+    def _muestrear(self):
+        while not self._parar.wait(self.intervalo):
+            self._escribir_memoria()
+
+    def _escribir_memoria(self):
+        actual = self._instantanea()
+        diferencias = actual.compare_to(self._anterior, 'traceback')
+        self._anterior = actual
+        self.instantaneas += 1
+        en_uso, pico = tracemalloc.get_traced_memory()
+
+        lineas = [
+            f"{self.herramienta}: instantánea {self.instantaneas} a los {time.monotonic() - self._inicio:.0f}s",
+            f"Memoria en uso: {en_uso / 1024:.0f} KiB (pico {pico / 1024:.0f} KiB)",
+            "",
+        ]
+        for diferencia in diferencias[:self.top]:
+            lineas.append(f"{diferencia.size_diff / 1024:+.1f} KiB ({diferencia.count_diff:+d} bloques), "
+                          f"total {diferencia.size / 1024:.1f} KiB")
+            lineas += [f"    {linea}" for linea in diferencia.traceback.format(most_recent_first=True)]
+        ruta = os.path.join(self.directorio, f"memoria-{self.instantaneas:04d}.txt")
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lineas) + '\n')
+
+
+@contextmanager
+def perfilar(herramienta: str, activo: Optional[bool] = None):
+    """Perfila el bloque si el perfilado está activo (por defecto, según ``REPOSETUP_PROFILE``)."""
+    if not (PROFILE if activo is None else activo):
+        yield None
+        return
+    perfil = Profiler(herramienta).iniciar()
+    try:
+        yield perfil
+    finally:
+        perfil.detener()
+        print(f"⚙️ Perfil de {herramienta}: {perfil.directorio}")
@@ -0,0 +1,252 @@
+"""Planificador unificado de commits, PRs e issues en un solo flujo cronológico.
+
+``planificar`` genera, para un rango de meses, un único flujo de eventos
+ordenado por fecha. ``UnifiedExecutor`` lo aplica al repositorio con una sola
+sincronización al principio: los commits y los PRs (commit en su rama y merge
+``--no-ff`` en la rama base) se escriben como objetos con ``GitExecutor`` y la
+rama base se actualiza una vez. Al final se publican las ramas de los PRs, se
+crean los PRs e issues por la API y se hace push de la rama base.
+
+Uso:
+    python scheduler.py --año 2024 --mes-inicio 1 --mes-fin 12 --commits 20 --prs 4 --issues 2
+    python scheduler.py --año 2024 --commits 20 --prs 4 --solo-plan
+"""
+import argparse
+import calendar
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from create_commits import REF_CHECKPOINT
+from create_issues import enviar_issue
+from create_pr import PRManager
+from event_log import EventLog, ocultar_token
+from git_executor import GitError, GitExecutor, repo_url_de
+from github_api import GITHUB_API_URL, GitHubAPI
+from profiling import perfilar
+from verify import verificar_ejecucion
+
+ENV_KEYS = ['GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'BASE_BRANCH', 'USER_EMAIL']
+
+
+class Evento(NamedTuple):
+    fecha: datetime
+    tipo: str
+    numero: int
+
+
+def planificar(año: int, mes_inicio: int, mes_fin: int, commits_mes: int = 0, prs_mes: int = 0,
+               issues_mes: int = 0, semilla: Optional[int] = None) -> List[Evento]:
+    """Flujo de eventos ordenado por fecha; ``numero`` es el orden del evento dentro de su mes."""
+    rng = random.Random(semilla)
+    eventos = []
+    for mes in range(mes_inicio, mes_fin + 1):
+        dias = calendar.monthrange(año, mes)[1]
+
+        def fecha(hora_min=0, hora_max=23):
+            return datetime(año, mes, rng.randint(1, dias), rng.randint(hora_min, hora_max), rng.randint(0, 59))
+
+        eventos += [Evento(fecha(), 'commit', n) for n in range(1, commits_mes + 1)]
+        # Los PRs mantienen el horario laboral del generador de PRs
+        eventos += [Evento(fecha(9, 18), 'pr', n) for n in range(1, prs_mes + 1)]
+        eventos += [Evento(fecha(), 'issue', n) for n in range(1, issues_mes + 1)]
+    return sorted(eventos)
+
+
+class UnifiedExecutor:
+    def __init__(self, env_vars: Dict[str, str], output_insert: Callable[[str], None],
+                 eventos: Optional[EventLog] = None, cwd: Optional[str] = None):
+        self.env_vars = env_vars
+        self.output_insert = output_insert
+        self.eventos = eventos
+        self.cwd = cwd
+        self.base_branch = env_vars['BASE_BRANCH']
+        self.repo_url = repo_url_de(env_vars)
+        self.git = GitExecutor(cwd, {'GITHUB_TOKEN': env_vars['GITHUB_TOKEN']}, eventos, env_vars['GITHUB_TOKEN'])
+        # Un solo cliente para PRs e issues: comparten presupuesto de reintentos y cortacircuitos
+        self.api = GitHubAPI(env_vars['GITHUB_TOKEN'], eventos, output_insert)
+        self.prs = PRManager(output_insert, eventos, cwd, self.base_branch, api=self.api)
+
+    def _emit(self, evento: str, **campos):
+        if self.eventos:
+            self.eventos.emit(evento, **campos)
+
+    def _agregar_linea(self, archivo: str, linea: str, entradas: Dict[str, tuple]):
+        ruta = os.path.abspath(os.path.join(self.cwd or '.', archivo))
+        with open(ruta, 'a') as f:
+            f.write(linea + '\n')
+        entradas[archivo] = ('100644', 'blob', self.git.escribir_blob(ruta))
+
+    def _commit(self, entradas: Dict[str, tuple], padres: List[str], mensaje: str, fecha: datetime) -> str:
+        return self.git.escribir_commit(
+            self.git.escribir_arbol(entradas), padres, mensaje, fecha,
+            self.env_vars['REPO_OWNER'], self.env_vars['USER_EMAIL']
+        )
+
+    def ejecutar(self, plan: List[Evento]) -> Dict[str, float]:
+        """Aplica el plan completo y devuelve métricas de la ejecución."""
+        metricas = {'commits': 0, 'prs': 0, 'issues': 0, 'push_segundos': 0.0, 'spawns': 0}
+        git = self.git
+        try:
+            self.output_insert("🔄 Sincronizando repositorio\n")
+            git.run('config', '--local', 'user.name', self.env_vars['REPO_OWNER'])
+            git.run('config', '--local', 'user.email', self.env_vars['USER_EMAIL'])
+            git.run('checkout', self.base_branch)
+            git.run('pull', '--allow-unrelated-histories', self.repo_url, self.base_branch)
+
+            cabeza = git.resolver('HEAD')
+            publicado = cabeza
+            entradas = git.leer_arbol('HEAD')
+            ramas = []
+            issues = []
+
+            self.output_insert(f"📅 Aplicando {len(plan)} eventos\n")
+            for evento in plan:
+                if evento.tipo == 'commit':
+                    self._agregar_linea('commits.log', f"Commit {evento.fecha.isoformat()}", entradas)
+                    cabeza = self._commit(entradas, [cabeza] if cabeza else [],
+                                          f"Commit del {evento.fecha.strftime('%d/%m/%Y')}", evento.fecha)
+                    metricas['commits'] += 1
+                    self._emit('commit', sha=cabeza, fecha=evento.fecha.isoformat())
+
+                elif evento.tipo == 'pr':
+                    rama = f"pr/{evento.fecha.strftime('%Y%m%d')}-{evento.numero:03d}"
+                    self._agregar_linea('historial.txt', f"PR {evento.numero} - {evento.fecha.isoformat()}", entradas)
+                    commit_rama = self._commit(entradas, [cabeza] if cabeza else [],
+                                               f"PR {evento.numero} - {evento.fecha.strftime('%Y-%m-%d %H:%M')}",
+                                               evento.fecha)
+                    # El árbol del merge --no-ff coincide con el de la rama porque la base no avanzó
+                    cabeza = self._commit(entradas, [cabeza, commit_rama] if cabeza else [commit_rama],
+                                          f"Merge {rama} ({evento.fecha.strftime('%Y-%m-%d')})", evento.fecha)
+                    git.actualizar_refs([(f'refs/heads/{rama}', commit_rama, None)])
+                    ramas.append((rama, evento))
+                    self._emit('commit', sha=commit_rama, rama=rama, fecha=evento.fecha.isoformat())
+
+                else:
+                    issues.append(evento)
+
+                if (metricas['commits'] + len(ramas)) % REF_CHECKPOINT == 0 and cabeza != publicado:
+                    git.actualizar_refs([('HEAD', cabeza, publicado)])
+                    publicado = cabeza
+
+            if cabeza != publicado:
+                git.actualizar_refs([('HEAD', cabeza, publicado)])
+            modificados = {ruta: entradas[ruta] for ruta in ('commits.log', 'historial.txt') if ruta in entradas}
+            if modificados:
+                git.actualizar_indice(modificados)
+
+            inicio = time.perf_counter()
+            if ramas:
+                # GitHub no admite PRs cuya rama ya está en la base: primero las ramas, luego los PRs
+                self.output_insert(f"🚀 Publicando {len(ramas)} ramas de PR\n")
+                git.push(self.repo_url, [f'refs/heads/{rama}:refs/heads/{rama}' for rama, _ in ramas], '--atomic')
+                for rama, evento in ramas:
+                    numero = self.prs.crear_pr({
+                        "title": f"PR {evento.numero} - {evento.fecha.strftime('%Y-%m')}",
+                        "head": rama,
+                        "base": self.base_branch,
+                        "body": f"PR generado automáticamente\nFecha: {evento.fecha}"
+                    })
+                    if numero:
+                        metricas['prs'] += 1
+                        self._emit('pr', numero=numero, rama=rama, fecha=evento.fecha.isoformat())
+                        self.output_insert(f"✅ PR #{numero} ({rama})\n")
+
+            self.output_insert(f"🚀 Push de {self.base_branch}\n")
+            git.push(self.repo_url, [self.base_branch] + [f':refs/heads/{rama}' for rama, _ in ramas], '--atomic')
+            git.actualizar_refs([(f'refs/heads/{rama}', None, None) for rama, _ in ramas])
+            metricas['push_segundos'] = time.perf_counter() - inicio
+
+            metricas['issues'] = self._crear_issues(issues)
+        finally:
+            git.close()
+            metricas['spawns'] = git.spawns
+        return metricas
+
+    def _crear_issues(self, issues: List[Evento]) -> int:
+        """Crea los issues en el orden del plan; GitHub no permite fecharlos en el pasado."""
+        url = f"{GITHUB_API_URL}/repos/{self.env_vars['REPO_OWNER']}/{self.env_vars['REPO_NAME']}/issues"
+        creados = 0
+        for evento in issues:
+            datos = {
+                'title': f"Issue {evento.numero} - {evento.fecha.strftime('%Y-%m-%d')}",
+                'body': f"Issue planificado para el {evento.fecha.strftime('%Y-%m-%d %H:%M')}"
+            }
+            try:
+                response, _ = enviar_issue(self.api, url, datos)
+            except requests.exceptions.RequestException as e:
+                self._emit('error', error=f"Error de conexión: {e}", titulo=datos['title'])
+                self.output_insert(f"❌ Issue '{datos['title']}': error de conexión\n")
+                continue
+            if response.ok:
+                issue = response.json()
+                creados += 1
+                self._emit('issue', numero=issue['number'], url=issue['html_url'])
+                self.output_insert(f"✅ Issue #{issue['number']}: {issue['html_url']}\n")
+            else:
+                self._emit('error', error=f"Error {response.status_code}", titulo=datos['title'])
+                self.output_insert(f"❌ Issue '{datos['title']}': error {response.status_code}\n")
+        return creados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Genera commits, PRs e issues en un solo flujo cronológico")
+    parser.add_argument('--año', type=int, default=datetime.now().year)
+    parser.add_argument('--mes-inicio', type=int, default=1)
+    parser.add_argument('--mes-fin', type=int, default=12)
+    parser.add_argument('--commits', type=int, default=0, help="Commits por mes")
+    parser.add_argument('--prs', type=int, default=0, help="PRs por mes")
+    parser.add_argument('--issues', type=int, default=0, help="Issues por mes")
+    parser.add_argument('--semilla', type=int, help="Semilla para obtener siempre el mismo plan")
+    parser.add_argument('--solo-plan', action='store_true', help="Muestra el plan sin aplicarlo")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.mes_inicio <= args.mes_fin <= 12:
+        parser.error("El rango de meses debe estar entre 1 y 12 y el inicio no puede superar al fin")
+
+    plan = planificar(args.año, args.mes_inicio, args.mes_fin, args.commits, args.prs, args.issues, args.semilla)
+    if args.solo_plan:
+        for evento in plan:
+            print(f"{evento.fecha.isoformat(sep=' ')}  {evento.tipo:<6} {evento.numero}")
+        return 0
+
+    load_dotenv('.env')
+    env_vars = {key: os.getenv(key) for key in ENV_KEYS}
+    if None in env_vars.values():
+        print("❌ Faltan variables en el archivo .env")
+        return 1
+    env_vars['REPO_URL'] = os.getenv('REPO_URL')
+
+    eventos = EventLog('unificado')
+    eventos.emit('inicio', año=args.año, mes_inicio=args.mes_inicio, mes_fin=args.mes_fin,
+                 commits_mes=args.commits, prs_mes=args.prs, issues_mes=args.issues, eventos=len(plan))
+    metricas = {}
+    try:
+        metricas = UnifiedExecutor(env_vars, lambda texto: print(texto, end='', flush=True), eventos).ejecutar(plan)
+    except (GitError, requests.exceptions.RequestException) as e:
+        error = ocultar_token(str(e), env_vars['GITHUB_TOKEN'])
+        eventos.emit('error', error=error)
+        print(f"❌ {error}")
+        return 1
+    finally:
+        eventos.emit('fin', **metricas)
+        eventos.close()
+    print(f"✅ {metricas['commits']} commits, {metricas['prs']} PRs y {metricas['issues']} issues "
+          f"con {metricas['spawns']} procesos git")
+    print(f"⚙️ Registro de eventos: {eventos.ruta}")
+    planificados = {tipo: sum(1 for evento in plan if evento.tipo == tipo) for tipo in ('commit', 'pr', 'issue')}
+    completo = (metricas['commits'] == planificados['commit'] and metricas['prs'] == planificados['pr']
+                and metricas['issues'] == planificados['issue'])
+    coincide = verificar_ejecucion(eventos.ruta, env_vars, lambda texto: print(texto, end=''))
+    return 0 if completo and coincide else 1
+
+
+if __name__ == "__main__":
+    with perfilar('scheduler'):
+        sys.exit(main())
@@ -0,0 +1,280 @@
+"""Verificación posterior de una ejecución contra el repositorio y GitHub.
+
+Compara el plan (parámetros de ``inicio``) y lo registrado en el registro de
+eventos (SHAs de commits, números de PRs e issues) con la realidad usando pocas
+consultas masivas:
+
+- un ``ls-remote`` para las puntas publicadas y las ramas ``pr/*`` sobrantes;
+- un único ``git log`` desde la punta publicada para los commits por mes;
+- una consulta paginada de issues y PRs actualizados desde el inicio.
+
+Uso:
+    python verify.py runs/commits-20240101-120000
+    python verify.py runs/prs-20240101-120000/eventos.jsonl --repo ../mi-repo
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from event_log import leer_eventos
+from git_executor import GitError, GitExecutor, repo_url_de
+from github_api import GITHUB_API_URL, GitHubAPI
+from profiling import perfilar
+
+# REPOSETUP_VERIFICAR=0 desactiva la verificación automática al final de cada herramienta
+VERIFICAR = os.getenv('REPOSETUP_VERIFICAR', '1') != '0'
+
+# Elementos de cada diferencia que se muestran antes de resumir el resto
+MAX_DETALLE = 10
+
+# Margen para atribuir a la ejecución los issues y PRs creados en su ventana de tiempo
+MARGEN = timedelta(seconds=5)
+
+# GitHub actualiza el estado de merge de forma asíncrona tras el push: consultas y espera entre ellas
+MERGE_CONSULTAS = 3
+MERGE_ESPERA = 2.0
+
+
+class Resultado:
+    def __init__(self):
+        self.faltan: List[str] = []
+        self.sobran: List[str] = []
+        self.consultas = 0
+        self.segundos = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.faltan and not self.sobran
+
+
+def plan_de(herramienta: str, params: dict) -> dict:
+    """Mínimos de commits por mes y número de PRs e issues que la ejecución debía crear."""
+    meses = range(params.get('mes_inicio', 1), params.get('mes_fin', 12) + 1)
+    año = params.get('año') or params.get('ano')
+    plan = {'año': año, 'commits_por_mes': {}, 'prs': 0, 'issues': None, 'bundle': bool(params.get('bundle'))}
+    if herramienta == 'commits':
+        plan['commits_por_mes'] = {mes: params['commits_mes'] for mes in meses}
+    elif herramienta == 'prs':
+        # Cada PR aporta el commit de su rama y el merge --no-ff
+        plan['commits_por_mes'] = {mes: 2 * params['prs_por_mes'] for mes in meses}
+        plan['prs'] = 0 if plan['bundle'] else params['prs_por_mes'] * len(meses)
+    elif herramienta == 'unificado':
+        plan['commits_por_mes'] = {mes: params['commits_mes'] + 2 * params['prs_mes'] for mes in meses}
+        plan['prs'] = params['prs_mes'] * len(meses)
+        plan['issues'] = params['issues_mes'] * len(meses)
+    elif herramienta == 'issues' and params.get('modo') == 'plantilla':
+        plan['issues'] = params['total']
+    return plan
+
+
+def leer_registro(ruta: str) -> dict:
+    """Herramienta, parámetros y elementos registrados de una ejecución."""
+    registro = {'herramienta': None, 'params': {}, 'commits': {}, 'prs': {}, 'issues': set(),
+                'inicio': None, 'fin': None}
+    for evento in leer_eventos(ruta):
+        nombre = evento.get('evento')
+        registro['herramienta'] = registro['herramienta'] or evento.get('herramienta')
+        registro['inicio'] = registro['inicio'] or evento.get('ts')
+        registro['fin'] = evento.get('ts')
+        if nombre == 'inicio':
+            registro['params'] = {k: v for k, v in evento.items() if k not in ('ts', 'run', 'herramienta', 'evento')}
+        elif nombre == 'commit':
+            registro['commits'][evento['sha']] = evento.get('fecha')
+        elif nombre == 'pr':
+            registro['prs'][evento['numero']] = evento.get('rama')
+        elif nombre == 'issue' and evento.get('estado') != 'cerrado':
+            registro['issues'].add(evento['numero'])
+    return registro
+
+
+def _utc(ts: str) -> datetime:
+    """Las marcas del registro están en hora local sin zona."""
+    return datetime.fromisoformat(ts).astimezone(timezone.utc)
+
+
+def _lista(elementos: list) -> str:
+    texto = ', '.join(str(e) for e in elementos[:MAX_DETALLE])
+    if len(elementos) > MAX_DETALLE:
+        texto += f" y {len(elementos) - MAX_DETALLE} más"
+    return texto
+
+
+class Verificador:
+    def __init__(self, env_vars: Dict[str, str], cwd: Optional[str] = None):
+        self.env_vars = env_vars
+        self.cwd = cwd
+        self.base_branch = env_vars.get('BASE_BRANCH') or 'main'
+
+    def verificar(self, ruta: str) -> Resultado:
+        inicio = time.perf_counter()
+        registro = leer_registro(ruta)
+        plan = plan_de(registro['herramienta'], registro['params'])
+        resultado = Resultado()
+        if plan['commits_por_mes'] or registro['commits']:
+            self._verificar_git(plan, registro, resultado)
+        if plan['prs'] or plan['issues'] or registro['prs'] or registro['issues']:
+            self._verificar_api(plan, registro, resultado)
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    def _verificar_git(self, plan: dict, registro: dict, resultado: Resultado):
+        token = self.env_vars.get('GITHUB_TOKEN') or ''
+        with GitExecutor(self.cwd, {'GITHUB_TOKEN': token}, token=token) as git:
+            local = git.resolver(f'refs/heads/{self.base_branch}')
+            if plan['bundle']:
+                # Sin conexión no hay nada publicado: se verifica la rama local que se exportó
+                tip = local
+            else:
+                repo_url = repo_url_de(self.env_vars)
+                resultado.consultas += 1
+                cabezas = {}
+                for linea in git.run('ls-remote', '--heads', repo_url).stdout.splitlines():
+                    sha, ref = linea.split('\t')
+                    cabezas[ref] = sha
+                tip = cabezas.get(f'refs/heads/{self.base_branch}')
+                sobrantes = sorted(ref[len('refs/heads/'):] for ref in cabezas if ref.startswith('refs/heads/pr/'))
+                if sobrantes:
+                    resultado.sobran.append(f"{len(sobrantes)} ramas pr/* en el remoto: {_lista(sobrantes)}")
+                if tip and git.resolver(tip) is None:
+                    git.run('fetch', '-q', repo_url, self.base_branch)
+                if tip and local and tip != local and git.run(
+                        'merge-base', '--is-ancestor', tip, local, check=False).returncode == 0:
+                    resultado.faltan.append(f"{self.base_branch} local tiene commits sin publicar")
+            if tip is None:
+                resultado.faltan.append(f"La rama {self.base_branch} no existe" + ("" if plan['bundle'] else " en el remoto"))
+                return
+
+            resultado.consultas += 1
+            shas = set()
+            por_mes = Counter()
+            for linea in git.run('log', '--format=%H %ad', '--date=short', tip).stdout.splitlines():
+                sha, fecha = linea.split(' ', 1)
+                shas.add(sha)
+                if plan['año'] and fecha.startswith(f"{plan['año']:04d}-"):
+                    por_mes[int(fecha[5:7])] += 1
+
+        perdidos = [sha[:10] for sha in registro['commits'] if sha not in shas]
+        if perdidos:
+            resultado.faltan.append(f"{len(perdidos)} commits registrados no están en {self.base_branch}: {_lista(perdidos)}")
+        for mes, minimo in sorted(plan['commits_por_mes'].items()):
+            if por_mes[mes] < minimo:
+                resultado.faltan.append(f"{mes:02d}/{plan['año']}: {por_mes[mes]} commits de al menos {minimo}")
+
+    def _esperar_merge(self, api: GitHubAPI, numeros: List[int], resultado: Resultado) -> List[int]:
+        """Vuelve a consultar los PRs sin merge; devuelve los que siguen sin mergear."""
+        url = f"{GITHUB_API_URL}/repos/{self.env_vars['REPO_OWNER']}/{self.env_vars['REPO_NAME']}/pulls"
+        for _ in range(MERGE_CONSULTAS):
+            if not numeros:
+                break
+            time.sleep(MERGE_ESPERA)
+            pendientes = []
+            for numero in numeros:
+                resultado.consultas += 1
+                response = api.solicitud('GET', f"{url}/{numero}")
+                if not (response.ok and response.json().get('merged')):
+                    pendientes.append(numero)
+            numeros = pendientes
+        return numeros
+
+    def _verificar_api(self, plan: dict, registro: dict, resultado: Resultado):
+        url = f"{GITHUB_API_URL}/repos/{self.env_vars['REPO_OWNER']}/{self.env_vars['REPO_NAME']}/issues"
+        api = GitHubAPI(self.env_vars['GITHUB_TOKEN'])
+        desde = _utc(registro['inicio'])
+        hasta = _utc(registro['fin']) + MARGEN
+        params = {'state': 'all', 'since': desde.strftime('%Y-%m-%dT%H:%M:%SZ'), 'per_page': 100}
+        issues, prs = {}, {}
+        while url:
+            resultado.consultas += 1
+            response = api.solicitud('GET', url, params=params)
+            response.raise_for_status()
+            for item in response.json():
+                (prs if 'pull_request' in item else issues)[item['number']] = item
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+        def creados_en_ventana(elementos):
+            return {
+                numero for numero, item in elementos.items()
+                if desde - MARGEN <= datetime.fromisoformat(item['created_at'].replace('Z', '+00:00')) <= hasta
+            }
+
+        if plan['prs'] and len(registro['prs']) < plan['prs']:
+            resultado.faltan.append(f"{plan['prs'] - len(registro['prs'])} PRs del plan no se crearon")
+        perdidos = sorted(set(registro['prs']) - set(prs))
+        if perdidos:
+            resultado.faltan.append(f"{len(perdidos)} PRs registrados no existen: {_lista(['#%d' % n for n in perdidos])}")
+        sin_merge = sorted(n for n in registro['prs'] if n in prs and not prs[n]['pull_request'].get('merged_at'))
+        sin_merge = self._esperar_merge(api, sin_merge, resultado)
+        if sin_merge:
+            resultado.faltan.append(f"{len(sin_merge)} PRs sin mergear: {_lista(['#%d' % n for n in sin_merge])}")
+
+        if plan['issues'] and len(registro['issues']) < plan['issues']:
+            resultado.faltan.append(f"{plan['issues'] - len(registro['issues'])} issues del plan no se crearon")
+        perdidos = sorted(registro['issues'] - set(issues))
+        if perdidos:
+            resultado.faltan.append(f"{len(perdidos)} issues registrados no existen: {_lista(['#%d' % n for n in perdidos])}")
+
+        # Creados durante la ejecución sin quedar registrados (p. ej. duplicados de un reintento)
+        if plan['prs'] or registro['prs']:
+            extra = sorted(creados_en_ventana(prs) - set(registro['prs']))
+            if extra:
+                resultado.sobran.append(f"{len(extra)} PRs sin registrar: {_lista(['#%d' % n for n in extra])}")
+        if plan['issues'] or registro['issues']:
+            extra = sorted(creados_en_ventana(issues) - registro['issues'])
+            if extra:
+                resultado.sobran.append(f"{len(extra)} issues sin registrar: {_lista(['#%d' % n for n in extra])}")
+
+
+def formatear(resultado: Resultado) -> str:
+    lineas = [f"\n🔍 Verificación: {resultado.consultas} consultas en {resultado.segundos:.1f}s"]
+    if resultado.ok:
+        lineas.append("✅ El resultado coincide con el plan")
+    lineas += [f"❌ Falta: {texto}" for texto in resultado.faltan]
+    lineas += [f"⚠️ Sobra: {texto}" for texto in resultado.sobran]
+    return '\n'.join(lineas) + '\n'
+
+
+def mostrar_verificacion(ruta: str, env_vars: Dict[str, str], output_insert: Callable[[str], None],
+                         cwd: Optional[str] = None) -> bool:
+    """Verifica una ejecución y muestra las diferencias en la consola; devuelve si coincide con el plan."""
+    try:
+        resultado = Verificador(env_vars, cwd).verificar(ruta)
+    except (requests.exceptions.RequestException, GitError, OSError, ValueError) as e:
+        output_insert(f"⚠️ No se pudo verificar la ejecución: {e}\n")
+        return False
+    output_insert(formatear(resultado))
+    return resultado.ok
+
+
+def verificar_ejecucion(ruta: str, env_vars: Dict[str, str], output_insert: Callable[[str], None],
+                        cwd: Optional[str] = None) -> bool:
+    """Verificación automática al final de cada herramienta, salvo con ``REPOSETUP_VERIFICAR=0``."""
+    if not VERIFICAR:
+        return True
+    return mostrar_verificacion(ruta, env_vars, output_insert, cwd)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara una ejecución registrada con el repositorio y GitHub")
+    parser.add_argument('registro', help="Directorio de la ejecución o su eventos.jsonl")
+    parser.add_argument('--repo', help="Repositorio de trabajo (por defecto el directorio actual)")
+    args = parser.parse_args(argv)
+
+    load_dotenv(os.path.join(args.repo or '.', '.env'))
+    env_vars = {key: os.getenv(key) for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME', 'BASE_BRANCH', 'REPO_URL')}
+    if not all(env_vars[key] for key in ('GITHUB_TOKEN', 'REPO_OWNER', 'REPO_NAME')):
+        print("❌ Faltan variables en el archivo .env")
+        return 1
+    return 0 if mostrar_verificacion(args.registro, env_vars, lambda texto: print(texto, end=''), args.repo) else 1
+
+
+if __name__ == "__main__":
+    with perfilar('verify'):
+        sys.exit(main())